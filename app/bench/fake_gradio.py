@@ -0,0 +1,372 @@
+"""Stand-in Ultimate TTS Gradio backend for load tests.
+
+Speaks enough of the Gradio 5 HTTP API (``/config``, ``/gradio_api/info``, the
+``sse_v3`` queue, uploads and ``/gradio_api/file=``) for ``gradio_client`` and
+``tts_proxy`` to treat it like the real app, without a GPU. Generation latency,
+engine load time, audio size, failure rate, occasional stalls and how many
+generations run at once are configurable; ``/gradio_api/cancel`` drops events
+that have not started, as Gradio does. Run from the ``app`` folder:
+
+    python bench/fake_gradio.py --port 7860 --latency-ms 800 --audio-kb 96
+
+``GET /fake/stats`` reports generations, engine loads and the deepest queue seen.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import random
+import struct
+import sys
+import tempfile
+import time
+import uuid
+import wave
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from tts_proxy import ENGINE_LOAD_API, ENGINE_REF_PARAM, KITTEN_VOICES, KNOWN_ENGINES  # noqa: E402
+
+API_NAME = "generate_unified_tts"
+KOKORO_VOICES = ["af_heart", "af_bella", "am_adam", "am_michael", "bf_emma", "bm_george"]
+HIGGS_VOICES = ["EMPTY", "en_woman", "en_man"]
+QWEN_SPEAKERS = ["Vivian", "Ryan", "Serena"]
+FILE_API_INFO = {
+    "type": "object",
+    "properties": {
+        "path": {"type": "string"},
+        "meta": {"default": {"_type": "gradio.FileData"}},
+    },
+}
+
+CONFIG = {
+    "latency": 0.5,
+    "char_latency": 0.0,
+    "jitter": 0.1,
+    "load_latency": 2.0,
+    "audio_bytes": 64 * 1024,
+    "fail_rate": 0.0,
+    "concurrency": 1,
+    "stall_rate": 0.0,
+    "stall": 30.0,
+}
+STATS = {
+    "generations": 0, "loads": 0, "failures": 0, "stalls": 0, "cancelled": 0, "max_queue": 0, "loaded_engine": None,
+}
+
+OUTPUT_DIR = Path(tempfile.mkdtemp(prefix="fake_gradio_"))
+SESSIONS: dict[str, dict] = {}
+EVENTS: dict[str, asyncio.Task] = {}
+GPU: asyncio.Semaphore = None
+WAITING = 0
+
+
+def parameter(name, default, component, python_type, choices=None):
+    info = {
+        "label": name,
+        "parameter_name": name,
+        "parameter_has_default": True,
+        "parameter_default": default,
+        "component": component,
+        "python_type": {"type": python_type, "description": ""},
+        "type": {"type": "number" if python_type in ("float", "int") else "string", "description": ""},
+    }
+    if choices:
+        info["choices"] = choices
+    return info
+
+
+def tts_parameters() -> list[dict]:
+    params = [
+        parameter("text_input", "", "Textbox", "str"),
+        parameter("tts_engine", "ChatterboxTTS", "Radio", "str", KNOWN_ENGINES),
+        parameter("audio_format", "wav", "Radio", "str", ["wav", "mp3"]),
+    ]
+    for ref_param in ENGINE_REF_PARAM.values():
+        if not any(item["parameter_name"] == ref_param for item in params):
+            params.append(parameter(ref_param, None, "Audio", "filepath"))
+    params += [
+        parameter("indextts2_emotion_audio", None, "Audio", "filepath"),
+        parameter("indextts2_emotion_mode", "audio_reference", "Radio", "str",
+                  ["audio_reference", "vector_control", "text_description"]),
+        parameter("kokoro_voice", KOKORO_VOICES[0], "Dropdown", "str", KOKORO_VOICES),
+        parameter("kitten_voice", KITTEN_VOICES[0], "Dropdown", "str", KITTEN_VOICES),
+        parameter("higgs_voice_preset", "EMPTY", "Dropdown", "str", HIGGS_VOICES),
+        parameter("qwen_speaker", QWEN_SPEAKERS[0], "Dropdown", "str", QWEN_SPEAKERS),
+        parameter("chatterbox_turbo_temperature", 0.8, "Slider", "float"),
+        parameter("chatterbox_turbo_seed", 0, "Number", "float"),
+        parameter("kokoro_speed", 1.0, "Slider", "float"),
+        parameter("chatterbox_mtl_language", "en", "Dropdown", "str", ["en", "de", "fr"]),
+    ]
+    return params
+
+
+def build_app_config() -> dict:
+    components = []
+    dependencies = []
+
+    def component(kind, label, file=False):
+        entry = {"id": len(components) + 1, "type": kind, "props": {"label": label}}
+        if file:
+            entry["api_info"] = FILE_API_INFO
+        components.append(entry)
+        return entry["id"]
+
+    inputs = [component("audio" if item["component"] == "Audio" else "textbox", item["parameter_name"],
+                        file=item["component"] == "Audio") for item in tts_parameters()]
+    outputs = [component("audio", "Generated Audio", file=True), component("textbox", "Status")]
+    dependencies.append({"id": 0, "api_name": API_NAME, "inputs": inputs, "outputs": outputs, "backend_fn": True})
+    for api_name in list(ENGINE_LOAD_API.values()) + ["/refresh_kokoro_voice_list"]:
+        status = component("markdown", "status")
+        dependencies.append({
+            "id": len(dependencies), "api_name": api_name.lstrip("/"), "inputs": [], "outputs": [status],
+            "backend_fn": True,
+        })
+    return {
+        "version": "5.0.0",
+        "protocol": "sse_v3",
+        "api_prefix": "/gradio_api",
+        "connect_heartbeat": False,
+        "components": components,
+        "dependencies": dependencies,
+    }
+
+
+APP_CONFIG = build_app_config()
+FN_NAMES = {dep["id"]: "/" + dep["api_name"] for dep in APP_CONFIG["dependencies"]}
+
+
+def api_info() -> dict:
+    named = {
+        f"/{API_NAME}": {
+            "parameters": tts_parameters(),
+            "returns": [{"label": "Generated Audio", "component": "Audio"}, {"label": "Status", "component": "Textbox"}],
+        }
+    }
+    for dep in APP_CONFIG["dependencies"][1:]:
+        named["/" + dep["api_name"]] = {"parameters": [], "returns": [{"label": "status", "component": "Markdown"}]}
+    return {"named_endpoints": named, "unnamed_endpoints": {}}
+
+
+def make_audio(fmt: str, text: str) -> bytes:
+    size = CONFIG["audio_bytes"]
+    if fmt != "wav":
+        return (b"\xff\xfb\x90\x64" + text.encode("utf-8")[:64]).ljust(size, b"\x00")
+    frames = max(1, (size - 44) // 2)
+    rate = 24000
+    samples = (int(8000 * math.sin(2 * math.pi * 220 * i / rate)) for i in range(frames))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"".join(struct.pack("<h", sample) for sample in samples))
+    return buffer.getvalue()
+
+
+def session_state(session_hash: str) -> dict:
+    state = SESSIONS.get(session_hash)
+    if state is None:
+        state = SESSIONS[session_hash] = {"queue": asyncio.Queue(), "pending": 0}
+    return state
+
+
+async def run_event(request_url: str, session_hash: str, event_id: str, fn_name: str, data: list) -> None:
+    global WAITING
+    state = session_state(session_hash)
+    send = state["queue"].put_nowait
+    WAITING += 1
+    STATS["max_queue"] = max(STATS["max_queue"], WAITING)
+    send({"msg": "estimation", "event_id": event_id, "rank": WAITING - 1, "queue_size": WAITING,
+          "rank_eta": WAITING * CONFIG["latency"]})
+    waiting = True
+    try:
+        async with GPU:
+            WAITING -= 1
+            waiting = False
+            # Like Gradio, a cancel only removes events that have not started yet.
+            EVENTS.pop(event_id, None)
+            send({"msg": "process_starts", "event_id": event_id, "eta": CONFIG["latency"]})
+            output = await handle(request_url, fn_name, data, event_id, send)
+    except asyncio.CancelledError:
+        STATS["cancelled"] += 1
+        send({"msg": "process_completed", "event_id": event_id, "output": {"error": "Cancelled"}, "success": False})
+    except Exception as exc:
+        STATS["failures"] += 1
+        send({"msg": "process_completed", "event_id": event_id, "output": {"error": str(exc)}, "success": False})
+    else:
+        send({"msg": "process_completed", "event_id": event_id,
+              "output": {"data": output, "is_generating": False}, "success": True})
+    finally:
+        if waiting:
+            WAITING -= 1
+        EVENTS.pop(event_id, None)
+        state["pending"] -= 1
+
+
+async def handle(request_url: str, fn_name: str, data: list, event_id: str, send) -> list:
+    if fn_name == "/refresh_kokoro_voice_list":
+        return [KOKORO_VOICES]
+    if fn_name in ENGINE_LOAD_API.values():
+        await asyncio.sleep(CONFIG["load_latency"])
+        STATS["loads"] += 1
+        STATS["loaded_engine"] = next(name for name, api in ENGINE_LOAD_API.items() if api == fn_name)
+        return [f"Loaded {STATS['loaded_engine']}"]
+    names = [item["parameter_name"] for item in tts_parameters()]
+    kwargs = dict(zip(names, data))
+    latency = max(0.0, random.gauss(CONFIG["latency"], CONFIG["jitter"]))
+    latency += CONFIG["char_latency"] * len(str(kwargs.get("text_input") or ""))
+    if random.random() < CONFIG["stall_rate"]:
+        STATS["stalls"] += 1
+        latency += CONFIG["stall"]
+    steps = 4
+    for step in range(steps):
+        await asyncio.sleep(latency / steps)
+        send({"msg": "progress", "event_id": event_id, "progress_data": [
+            {"progress": (step + 1) / steps, "index": step + 1, "length": steps, "unit": "steps", "desc": None}
+        ]})
+    if random.random() < CONFIG["fail_rate"]:
+        raise RuntimeError("Simulated generation failure")
+    fmt = kwargs.get("audio_format") or "wav"
+    path = OUTPUT_DIR / f"{uuid.uuid4().hex}.{fmt}"
+    path.write_bytes(make_audio(fmt, str(kwargs.get("text_input") or "")))
+    STATS["generations"] += 1
+    return [
+        {"path": str(path), "url": f"{request_url}gradio_api/file={path}", "orig_name": path.name,
+         "mime_type": f"audio/{'mpeg' if fmt == 'mp3' else 'wav'}", "meta": {"_type": "gradio.FileData"}},
+        f"Generated with {kwargs.get('tts_engine')}",
+    ]
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    global GPU
+    GPU = asyncio.Semaphore(CONFIG["concurrency"])
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/config")
+def config() -> dict:
+    return APP_CONFIG
+
+
+@app.get("/gradio_api/info")
+def info() -> dict:
+    return api_info()
+
+
+@app.get("/gradio_api/queue/status")
+def queue_status() -> dict:
+    return {"msg": "estimation", "queue_size": WAITING, "rank_eta": WAITING * CONFIG["latency"]}
+
+
+@app.post("/gradio_api/queue/join")
+async def queue_join(request: Request) -> dict:
+    body = await request.json()
+    session_hash = body.get("session_hash") or uuid.uuid4().hex
+    fn_name = FN_NAMES.get(body.get("fn_index"))
+    if fn_name is None:
+        return JSONResponse({"detail": "Unknown fn_index"}, status_code=422)
+    event_id = uuid.uuid4().hex
+    session_state(session_hash)["pending"] += 1
+    EVENTS[event_id] = asyncio.create_task(
+        run_event(str(request.base_url), session_hash, event_id, fn_name, body.get("data") or [])
+    )
+    return {"event_id": event_id}
+
+
+@app.post("/gradio_api/cancel")
+async def cancel(request: Request) -> dict:
+    body = await request.json()
+    task = EVENTS.pop(body.get("event_id"), None)
+    if task is not None:
+        task.cancel()
+    return {"success": task is not None}
+
+
+@app.get("/gradio_api/queue/data")
+async def queue_data(session_hash: str) -> StreamingResponse:
+    state = session_state(session_hash)
+
+    async def events():
+        while True:
+            try:
+                message = await asyncio.wait_for(state["queue"].get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield f"data: {json.dumps({'msg': 'heartbeat'})}\n\n"
+                continue
+            yield f"data: {json.dumps(message)}\n\n"
+            if message["msg"] == "process_completed" and state["pending"] <= 0 and state["queue"].empty():
+                SESSIONS.pop(session_hash, None)
+                yield f"data: {json.dumps({'msg': 'close_stream'})}\n\n"
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/gradio_api/upload")
+async def upload(files: list[UploadFile]) -> list[str]:
+    paths = []
+    for item in files:
+        path = OUTPUT_DIR / f"upload_{uuid.uuid4().hex}_{Path(item.filename or 'file').name}"
+        path.write_bytes(await item.read())
+        paths.append(str(path))
+    return paths
+
+
+@app.get("/gradio_api/file={file_path:path}")
+def file(file_path: str) -> Response:
+    path = Path(file_path)
+    if OUTPUT_DIR not in path.parents or not path.exists():
+        return Response(status_code=404)
+    return Response(path.read_bytes(), media_type="audio/wav" if path.suffix == ".wav" else "audio/mpeg")
+
+
+@app.get("/fake/stats")
+def stats() -> dict:
+    return {**STATS, "waiting": WAITING, "config": CONFIG, "time": time.time()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Ultimate TTS Gradio backend.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--latency-ms", type=float, default=500, help="mean generation latency")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="standard deviation of generation latency")
+    parser.add_argument("--load-ms", type=float, default=2000, help="engine load latency")
+    parser.add_argument("--audio-kb", type=float, default=64, help="size of each generated clip")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of generations that fail")
+    parser.add_argument("--concurrency", type=int, default=1, help="generations processed at once")
+    parser.add_argument("--char-ms", type=float, default=0, help="extra latency per input character")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="fraction of generations that stall")
+    parser.add_argument("--stall-ms", type=float, default=30000, help="extra latency of a stalled generation")
+    args = parser.parse_args()
+    CONFIG.update(
+        latency=args.latency_ms / 1000,
+        char_latency=args.char_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        load_latency=args.load_ms / 1000,
+        audio_bytes=int(args.audio_kb * 1024),
+        fail_rate=args.fail_rate,
+        concurrency=max(1, args.concurrency),
+        stall_rate=args.stall_rate,
+        stall=args.stall_ms / 1000,
+    )
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Load generator for the proxy.
+
+Replays a mix of engines and voices against ``/v1/audio/speech`` at a fixed
+concurrency and reports latency percentiles, throughput, error rate and the
+proxy's memory use, so changes can be compared run to run. Either point it at a
+running proxy, or let it start ``bench/fake_gradio.py`` plus a proxy wired to it.
+Run from the ``app`` folder:
+
+    python bench/loadgen.py --spawn --concurrency 8 --duration 30 \\
+        --mix "Kokoro TTS:af_heart,am_adam=3" --mix "KittenTTS=1" --record bench/load_history.jsonl
+    python bench/loadgen.py --url http://127.0.0.1:42025 --api-key ... --requests 200
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR / "bench"))
+
+from startup import free_port  # noqa: E402
+
+DEFAULT_MIX = ["Kokoro TTS:af_heart,am_adam=3", "KittenTTS:expr-voice-2-f=1"]
+DEFAULT_TEXTS = [
+    "Hello there.",
+    "The quick brown fox jumps over the lazy dog.",
+    "Welcome back. Your meeting starts in five minutes, and the room has moved to the third floor.",
+    "Chapter one. It was a bright cold day in April, and the clocks were striking thirteen.",
+    "Thanks for calling. Please hold while we connect you to the next available agent.",
+]
+
+
+def parse_mix(items: list[str]) -> list[tuple[str, list[str], float]]:
+    """Parse ``ENGINE[:VOICE,VOICE][=WEIGHT]`` entries."""
+    mix = []
+    for item in items:
+        spec, _, weight = item.partition("=")
+        engine, _, voices = spec.partition(":")
+        mix.append((engine.strip(), [v.strip() for v in voices.split(",") if v.strip()], float(weight or 1)))
+    return mix
+
+
+def percentile(values: list[float], pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 1)
+
+
+def rss_mb(pid: int):
+    """Resident set size of a process in MiB (Linux /proc, psutil when installed)."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import psutil
+
+        return round(psutil.Process(pid).memory_info().rss / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+def wait_ready(url: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1.0) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def spawn_stack(args) -> tuple[str, list[str], list[subprocess.Popen], tempfile.TemporaryDirectory]:
+    procs, fake_urls = [], []
+    for _ in range(max(1, args.replicas)):
+        fake_port = free_port()
+        procs.append(subprocess.Popen(
+            [
+                sys.executable, str(APP_DIR / "bench" / "fake_gradio.py"),
+                "--port", str(fake_port),
+                "--latency-ms", str(args.fake_latency_ms),
+                "--jitter-ms", str(args.fake_jitter_ms),
+                "--load-ms", str(args.fake_load_ms),
+                "--audio-kb", str(args.fake_audio_kb),
+                "--fail-rate", str(args.fake_fail_rate),
+                "--concurrency", str(args.fake_concurrency),
+                "--char-ms", str(args.fake_char_ms),
+                "--stall-rate", str(args.fake_stall_rate),
+                "--stall-ms", str(args.fake_stall_ms),
+            ],
+            cwd=APP_DIR,
+            stdout=subprocess.DEVNULL,
+        ))
+        fake_urls.append(f"http://127.0.0.1:{fake_port}/")
+    proxy_port = free_port()
+    env = os.environ.copy()
+    # Settings, metadata snapshots, jobs and cached audio all go to a scratch folder
+    # removed after the run, and the result cache stays off so repeated texts still
+    # exercise the proxy and backend rather than a disk read.
+    scratch = tempfile.TemporaryDirectory(prefix="loadgen_")
+    env_file = Path(scratch.name) / "ENVIRONMENT"
+    env_file.write_text(f"GRADIO_URL={fake_urls[0]}\n", encoding="utf-8")
+    env.update(
+        GRADIO_URL=fake_urls[0],
+        GRADIO_REPLICAS=",".join(fake_urls[1:]),
+        PROXY_ENV_FILE=str(env_file),
+        PROXY_DATA_DIR=str(Path(scratch.name) / "data"),
+        RESULT_CACHE_MB="0",
+        LOG_LEVEL=env.get("LOG_LEVEL", "WARNING"),
+    )
+    procs.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "tts_proxy:app", "--host", "127.0.0.1", "--port", str(proxy_port),
+         "--log-level", "warning"],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    ))
+    try:
+        for fake_url in fake_urls:
+            wait_ready(fake_url + "config", args.timeout)
+        wait_ready(f"http://127.0.0.1:{proxy_port}/health", args.timeout)
+    except Exception:
+        stop(procs)
+        scratch.cleanup()
+        raise
+    return f"http://127.0.0.1:{proxy_port}", fake_urls, procs, scratch
+
+
+def stop(procs: list[subprocess.Popen]) -> None:
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            value = rss_mb(self.pid)
+            if value is not None:
+                self.samples.append(value)
+            self.stopped.wait(self.interval)
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"start_mb": None, "peak_mb": None, "end_mb": None}
+        return {"start_mb": self.samples[0], "peak_mb": max(self.samples), "end_mb": self.samples[-1]}
+
+
+def run_load(args, base_url: str) -> dict:
+    mix = parse_mix(args.mix or DEFAULT_MIX)
+    weights = [weight for _, _, weight in mix]
+    texts = DEFAULT_TEXTS
+    if args.texts:
+        texts = [line.strip() for line in Path(args.texts).read_text(encoding="utf-8").splitlines() if line.strip()]
+    headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else {}
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    results = []
+    results_lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    issued = iter(range(args.requests)) if not args.duration else None
+    issue_lock = threading.Lock()
+
+    def next_payload():
+        with issue_lock:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return None
+            elif next(issued, None) is None:
+                return None
+        with rng_lock:
+            engine, voices, _ = rng.choices(mix, weights=weights)[0]
+            payload = {"model": engine, "input": rng.choice(texts), "response_format": args.format}
+            if voices:
+                payload["voice"] = rng.choice(voices)
+        return payload
+
+    def worker() -> None:
+        with httpx.Client(base_url=base_url, headers=headers, timeout=args.request_timeout) as client:
+            while True:
+                payload = next_payload()
+                if payload is None:
+                    return
+                started = time.perf_counter()
+                status, size = None, 0
+                try:
+                    resp = client.post("/v1/audio/speech", json=payload)
+                    status, size = resp.status_code, len(resp.content)
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                with results_lock:
+                    results.append({
+                        "engine": payload["model"],
+                        "status": status,
+                        "bytes": size,
+                        "latency": time.perf_counter() - started,
+                    })
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    ok = [item for item in results if item["status"] == 200]
+    errors = {}
+    for item in results:
+        if item["status"] != 200:
+            errors[str(item["status"])] = errors.get(str(item["status"]), 0) + 1
+    latencies = [item["latency"] for item in ok]
+    per_engine = {}
+    for engine in sorted({item["engine"] for item in results}):
+        engine_ok = [item["latency"] for item in ok if item["engine"] == engine]
+        per_engine[engine] = {
+            "requests": sum(1 for item in results if item["engine"] == engine),
+            "p50_ms": percentile(engine_ok, 50),
+            "p95_ms": percentile(engine_ok, 95),
+        }
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else None,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else None,
+        "throughput_kib_s": round(sum(item["bytes"] for item in ok) / 1024 / elapsed, 1) if elapsed else None,
+        "latency": {
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else None,
+            "max_ms": round(max(latencies) * 1000, 1) if latencies else None,
+        },
+        "per_engine": per_engine,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay TTS traffic against the proxy.")
+    parser.add_argument("--url", help="Base URL of a running proxy (omit with --spawn).")
+    parser.add_argument("--spawn", action="store_true", help="Start the fake backend and a proxy for this run.")
+    parser.add_argument("--api-key", default=os.environ.get("TTS_API_KEY"))
+    parser.add_argument("--proxy-pid", type=int, help="Sample this process's memory (automatic with --spawn).")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="Total requests (ignored with --duration).")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a fixed count.")
+    parser.add_argument("--mix", action="append", help="ENGINE[:VOICE,VOICE][=WEIGHT]; repeatable.")
+    parser.add_argument("--texts", help="File with one input text per line.")
+    parser.add_argument("--format", default="mp3")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--request-timeout", type=float, default=300.0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Startup timeout for --spawn.")
+    parser.add_argument("--fake-latency-ms", type=float, default=500)
+    parser.add_argument("--fake-jitter-ms", type=float, default=100)
+    parser.add_argument("--fake-load-ms", type=float, default=2000)
+    parser.add_argument("--fake-audio-kb", type=float, default=64)
+    parser.add_argument("--fake-fail-rate", type=float, default=0.0)
+    parser.add_argument("--fake-concurrency", type=int, default=1)
+    parser.add_argument("--fake-char-ms", type=float, default=0)
+    parser.add_argument("--fake-stall-rate", type=float, default=0.0)
+    parser.add_argument("--fake-stall-ms", type=float, default=30000)
+    parser.add_argument("--replicas", type=int, default=1, help="Fake backends to spawn (GRADIO_REPLICAS).")
+    parser.add_argument("--record", help="Append the summary as a JSON line to this file.")
+    args = parser.parse_args()
+    if not args.url and not args.spawn:
+        parser.error("pass --url or --spawn")
+
+    procs = []
+    fake_urls = []
+    scratch = None
+    base_url = (args.url or "").rstrip("/")
+    pid = args.proxy_pid
+    if args.spawn:
+        base_url, fake_urls, procs, scratch = spawn_stack(args)
+        pid = procs[-1].pid
+    sampler = MemorySampler(pid) if pid else None
+    try:
+        if sampler:
+            sampler.start()
+        summary = run_load(args, base_url)
+        if fake_urls:
+            summary["backend"] = {}
+            for fake_url in fake_urls:
+                with urllib.request.urlopen(fake_url + "fake/stats", timeout=5) as resp:
+                    stats = json.load(resp)
+                for key in ("generations", "loads", "failures", "stalls", "cancelled"):
+                    summary["backend"][key] = summary["backend"].get(key, 0) + stats[key]
+                summary["backend"]["max_queue"] = max(summary["backend"].get("max_queue", 0), stats["max_queue"])
+    finally:
+        if sampler:
+            sampler.stopped.set()
+            sampler.join()
+        stop(procs)
+        if scratch:
+            scratch.cleanup()
+
+    summary = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "concurrency": args.concurrency,
+        "replicas": len(fake_urls) or None,
+        "mix": args.mix or DEFAULT_MIX,
+        **summary,
+        "memory": sampler.summary() if sampler else None,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(summary) + "\n")
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
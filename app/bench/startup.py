@@ -0,0 +1,112 @@
+"""Time-to-ready benchmark for the proxy.
+
+Starts ``uvicorn tts_proxy:app`` the same way ``start.js`` does, and measures how
+long it takes until uvicorn prints its URL line (what Pinokio waits for) and
+until ``/health`` answers. Run from the ``app`` folder:
+
+    python bench/startup.py --runs 5 --record bench/startup_history.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+URL_PATTERN = re.compile(r"http://[0-9.:]+")
+TIMING_PATTERN = re.compile(r"Startup timing: (.*)")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(timeout: float) -> dict:
+    port = free_port()
+    env = os.environ.copy()
+    env.setdefault("GRADIO_URL", "http://127.0.0.1:9/")
+    env.setdefault("LOG_LEVEL", "INFO")
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "tts_proxy:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    result = {"url_line": None, "health": None, "timing": None}
+    try:
+        for line in proc.stdout:
+            match = TIMING_PATTERN.search(line)
+            if match:
+                result["timing"] = match.group(1).strip()
+            if URL_PATTERN.search(line):
+                result["url_line"] = time.perf_counter() - started
+                break
+            if time.perf_counter() - started > timeout:
+                break
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1.0) as resp:
+                    if resp.status == 200:
+                        result["health"] = time.perf_counter() - started
+                        break
+            except OSError:
+                time.sleep(0.01)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return result
+
+
+def summarize(values: list) -> dict:
+    values = [value for value in values if value is not None]
+    if not values:
+        return {"min_ms": None, "median_ms": None, "max_ms": None}
+    return {
+        "min_ms": round(min(values) * 1000, 1),
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure proxy time-to-ready.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--record", help="Append the summary as a JSON line to this file.")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.timeout) for _ in range(max(1, args.runs))]
+    summary = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "runs": len(runs),
+        "url_line": summarize([run["url_line"] for run in runs]),
+        "health": summarize([run["health"] for run in runs]),
+        "last_timing_log": runs[-1]["timing"],
+    }
+    print(json.dumps(summary, indent=2))
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(summary) + "\n")
+    return 0 if summary["health"]["median_ms"] is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""Render a long document to per-chapter audio with resumable segment checkpoints.
+
+Reads plain text, markdown or SSML, splits it into chapters and sentence
+segments, and renders the segments in parallel on the configured Gradio
+backends using the proxy's presets and engine handling. Run from the ``app``
+folder:
+
+    python bulk_synth.py book.md --voice matt-chatterbox-turbo --out out/book
+    python bulk_synth.py ch01.txt ch02.txt ch03.txt --model "Kokoro TTS" --voice af_heart
+
+Markdown starts a chapter at each ``#`` or ``##`` heading; a text or SSML file
+is one chapter. Every rendered segment is kept under ``<out>/segments``, in a
+folder per input file and named by its text and settings rather than its
+position, so a rerun after a failure, an interruption or an edit only renders
+what is missing or changed. Chapter audio
+goes to ``<out>/chapters`` and each segment's file, text and position in it to
+``<out>/manifest.json``.
+
+The CLI runs the proxy code in-process with its own admission gates and loaded
+engine tracking, so it does not share a running proxy's concurrency limits.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import zlib
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from fastapi import HTTPException
+
+import tts_proxy as tp
+
+SSML_BREAK_TAGS = ("p", "break")
+# Roughly one sentence in this many may end a segment early (see split_stable).
+STABLE_CUT_EVERY = 4
+
+
+def strip_markdown(text: str) -> str:
+    text = re.sub(r"```.*?```", "", text, flags=re.S)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"^\s*(?:>\s*)+", "", text, flags=re.M)
+    text = re.sub(r"^\s*(?:[-*+]|\d+[.)])\s+", "", text, flags=re.M)
+    text = re.sub(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$", "", text, flags=re.M)
+    return re.sub(r"[*_`~]+", "", text)
+
+
+def read_markdown(path: Path) -> list[tuple[str, str]]:
+    chapters = []
+    title, lines = path.stem, []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        heading = re.match(r"^#{1,2}\s+(.*?)\s*#*\s*$", line)
+        if heading:
+            if "".join(lines).strip():
+                chapters.append((title, strip_markdown("\n".join(lines))))
+            title, lines = strip_markdown(heading.group(1)).strip() or path.stem, []
+            continue
+        lines.append(line)
+    if "".join(lines).strip():
+        chapters.append((title, strip_markdown("\n".join(lines))))
+    return chapters
+
+
+def read_ssml(path: Path) -> list[tuple[str, str]]:
+    """Read the spoken text of an SSML document; ``<p>`` and ``<break>`` end a paragraph."""
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError as exc:
+        raise ValueError(f"{path}: invalid SSML: {exc}") from exc
+    pieces = []
+
+    def walk(element: ET.Element) -> None:
+        tag = element.tag.rsplit("}", 1)[-1]
+        pieces.append(element.text or "")
+        for child in element:
+            walk(child)
+        if tag in SSML_BREAK_TAGS:
+            pieces.append("\n\n")
+        pieces.append(element.tail or "")
+
+    walk(root)
+    return [(path.stem, "".join(pieces))]
+
+
+def read_chapters(paths: list[str]) -> list[dict]:
+    chapters = []
+    for name in paths:
+        path = Path(name)
+        suffix = path.suffix.lower()
+        if suffix in (".md", ".markdown"):
+            found = read_markdown(path)
+        elif suffix in (".ssml", ".xml"):
+            found = read_ssml(path)
+        else:
+            found = [(path.stem, path.read_text(encoding="utf-8"))]
+        chapters.extend(
+            {"title": title, "source": str(path), "text": text} for title, text in found if text.strip()
+        )
+    return chapters
+
+
+def segment_key(tts_engine: str, params: dict) -> str:
+    blob = json.dumps([tts_engine, params], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def split_stable(text: str, max_chars: int) -> list[tuple[str, bool]]:
+    """Split text like ``split_long_text``, but with cut points that survive edits.
+
+    Besides the length limit, a segment also ends after any sentence whose hash
+    picks it once the segment is half full. Cuts then depend on nearby sentences
+    only, so after an inserted or deleted sentence the segments line up with the
+    previous run again within a segment or two, and their checkpoints are reused.
+    """
+    segments: list[tuple[str, bool]] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        sentences, rest = tp.split_ready_segments(" ".join(paragraph.split()) + "\n")
+        if rest.strip():
+            sentences.append(rest.strip())
+        first = len(segments)
+        current = ""
+        for sentence in sentences:
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                segments.append((current, False))
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+            if len(current) >= max_chars // 2 and zlib.crc32(sentence.encode("utf-8")) % STABLE_CUT_EVERY == 0:
+                segments.append((current, False))
+                current = ""
+        if current:
+            segments.append((current, True))
+        elif len(segments) > first:
+            segments[-1] = (segments[-1][0], True)
+    return segments
+
+
+def checkpoint_dir(out_dir: Path, source: str) -> Path:
+    """Checkpoint folder of one input file, named by its stem and full path."""
+    digest = hashlib.sha256(str(Path(source).resolve()).encode("utf-8")).hexdigest()[:8]
+    return out_dir / "segments" / f"{tp.slugify(Path(source).stem)}-{digest}"
+
+
+def plan_segments(chapters: list[dict], tts_engine: str, params: dict, segment_chars: int, out_dir: Path) -> list[dict]:
+    """Split each chapter into segments and assign each its checkpoint path.
+
+    A checkpoint is named by the segment's text and settings plus a counter for
+    repeats of the same text, never by its position, so inserting or removing
+    text elsewhere keeps every other checkpoint. Order lives in the plan (and the
+    manifest). Each input file has its own checkpoint folder, and only the folders
+    of the files being planned are pruned of checkpoints that no longer match a
+    segment, so other inputs rendered into the same ``out_dir`` keep theirs.
+    """
+    seen: dict[str, int] = {}
+    for chapter in chapters:
+        segment_dir = checkpoint_dir(out_dir, chapter["source"])
+        chapter["segments"] = []
+        for text, ends_paragraph in split_stable(chapter["text"], segment_chars):
+            segment_params = dict(params, text_input=text)
+            key = segment_key(tts_engine, segment_params)
+            seen[key] = seen.get(key, 0) + 1
+            chapter["segments"].append({
+                "text": text,
+                "ends_paragraph": ends_paragraph,
+                "params": segment_params,
+                "path": segment_dir / f"{key}-{seen[key]}.wav",
+            })
+    keep = {segment["path"] for chapter in chapters for segment in chapter["segments"]}
+    for segment_dir in {checkpoint_dir(out_dir, chapter["source"]) for chapter in chapters}:
+        if segment_dir.is_dir():
+            for stale in segment_dir.glob("*.wav"):
+                if stale not in keep:
+                    stale.unlink()
+    return chapters
+
+
+def render_segments(pending: list[dict], tts_engine: str, jobs: int, stop: threading.Event) -> list[tuple[dict, str]]:
+    """Render segments on the backend slots, writing each checkpoint as it finishes.
+
+    Unlike a fanned-out request, a failed segment does not stop the others; the
+    failures are returned so a rerun can pick them up.
+    """
+    queue = deque(pending)
+    lock = threading.Lock()
+    failures: list[tuple[dict, str]] = []
+    total = len(pending)
+    done = [0]
+
+    def work(url: str) -> None:
+        while not stop.is_set():
+            with lock:
+                if not queue:
+                    return
+                segment = queue.popleft()
+            started = time.monotonic()
+            try:
+                source = tp.call_gradio_tts(tts_engine, segment["params"], stop.is_set, url)
+                chunks, _ = tp.open_backend_audio(source, url)
+                audio = b"".join(chunks)
+            except Exception as exc:
+                with lock:
+                    failures.append((segment, str(exc.detail if isinstance(exc, HTTPException) else exc)))
+                continue
+            segment["path"].parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = segment["path"].with_suffix(".tmp")
+            tmp_path.write_bytes(audio)
+            os.replace(tmp_path, segment["path"])
+            with lock:
+                done[0] += 1
+                print(f"  [{done[0]}/{total}] {segment['path'].name} "
+                      f"({time.monotonic() - started:.1f}s)")
+
+    slots = tp.fanout_slots(tts_engine)
+    if jobs:
+        slots = (slots * jobs)[:jobs]
+    executor = ThreadPoolExecutor(max_workers=len(slots), thread_name_prefix="tts-bulk")
+    futures = [executor.submit(work, url) for url in slots]
+    try:
+        while wait(futures, timeout=0.5).not_done:
+            pass
+    except KeyboardInterrupt:
+        print("Interrupted; waiting for running segments to finish...", file=sys.stderr)
+        stop.set()
+    executor.shutdown(wait=True)
+    for future in futures:
+        if future.exception() is not None:
+            raise future.exception()
+    return failures
+
+
+def write_chapters(chapters: list[dict], out_fmt: str, out_dir: Path) -> list[dict]:
+    chapter_dir = out_dir / "chapters"
+    chapter_dir.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    for number, chapter in enumerate(chapters, 1):
+        segments = chapter["segments"]
+        if not segments or not all(segment["path"].exists() for segment in segments):
+            continue
+        timings: list[tuple[float, float]] = []
+        audio = tp.join_wav_segments(
+            [segment["path"].read_bytes() for segment in segments],
+            [segment["ends_paragraph"] for segment in segments],
+            timings,
+        )
+        if out_fmt == "mp3":
+            audio = tp.encode_mp3(audio)
+        path = chapter_dir / f"{number:02d}-{tp.slugify(chapter['title'])}.{out_fmt}"
+        path.write_bytes(audio)
+        manifest.append({
+            "index": number,
+            "title": chapter["title"],
+            "source": chapter["source"],
+            "file": str(path.relative_to(out_dir)),
+            "duration": timings[-1][1],
+            "segments": [
+                {
+                    "index": index,
+                    "file": str(segment["path"].relative_to(out_dir)),
+                    "text": segment["text"],
+                    "start": start,
+                    "end": end,
+                }
+                for index, (segment, (start, end)) in enumerate(zip(segments, timings))
+            ],
+        })
+    written = {out_dir / chapter["file"] for chapter in manifest}
+    for stale in chapter_dir.glob("*.*"):
+        if stale.suffix in (".wav", ".mp3") and stale not in written:
+            stale.unlink()
+    return manifest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="Text (.txt), markdown (.md) or SSML (.ssml, .xml) files, in reading order.")
+    parser.add_argument("--out", default="bulk_output", help="Output folder; reuse it to resume a run.")
+    parser.add_argument("--voice", help="Preset, voice sample or engine voice.")
+    parser.add_argument("--model", help="TTS engine; defaults to the preset's engine or DEFAULT_TTS_ENGINE.")
+    parser.add_argument("--speed", type=float)
+    parser.add_argument("--format", dest="response_format", choices=("wav", "mp3"), default="wav")
+    parser.add_argument("--jobs", type=int, default=0, help="Segments rendered at once; defaults to one per backend slot.")
+    parser.add_argument("--segment-chars", type=int, default=tp.FANOUT_SEGMENT_CHARS, help="Target segment length.")
+    args = parser.parse_args()
+
+    if args.response_format == "mp3" and not shutil.which("ffmpeg"):
+        print("mp3 output needs ffmpeg on PATH", file=sys.stderr)
+        return 1
+    try:
+        chapters = read_chapters(args.inputs)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if not chapters:
+        print("Nothing to synthesize", file=sys.stderr)
+        return 1
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    tp.apply_gradio_env_override()
+    tp.ensure_data_dirs()
+    tp.get_default_params()
+    if not tp.GRADIO_STATUS["connected"]:
+        print(f"Gradio backend unavailable: {tp.GRADIO_STATUS['message']}", file=sys.stderr)
+        return 1
+    req = tp.OpenAITTSSpeechRequest(
+        input="-", model=args.model, voice=args.voice, response_format="wav", speed=args.speed
+    )
+    try:
+        tts_engine, _, params = tp.build_speech_params(req)
+    except HTTPException as exc:
+        print(exc.detail, file=sys.stderr)
+        return 1
+
+    out_dir = Path(args.out)
+    chapters = plan_segments(chapters, tts_engine, dict(params, audio_format="wav"), args.segment_chars, out_dir)
+    segments = [segment for chapter in chapters for segment in chapter["segments"]]
+    pending = [segment for segment in segments if not segment["path"].exists()]
+    print(f"{len(chapters)} chapters, {len(segments)} segments on {tts_engine}; "
+          f"{len(segments) - len(pending)} already rendered")
+
+    stop = threading.Event()
+    started = time.monotonic()
+    failures = render_segments(pending, tts_engine, args.jobs, stop) if pending else []
+    if pending:
+        print(f"Rendered {len(pending) - len(failures)} segments in {time.monotonic() - started:.1f}s")
+    for segment, error in failures:
+        print(f"Failed {segment['path'].name}: {error}", file=sys.stderr)
+
+    manifest = write_chapters(chapters, args.response_format, out_dir)
+    tp.save_json(out_dir / "manifest.json", {
+        "engine": tts_engine,
+        "voice": args.voice,
+        "format": args.response_format,
+        "complete": len(manifest) == len(chapters),
+        "chapters": manifest,
+    })
+    print(f"Wrote {len(manifest)}/{len(chapters)} chapters to {out_dir / 'chapters'}")
+    return 0 if len(manifest) == len(chapters) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
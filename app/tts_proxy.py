@@ -1,19 +1,49 @@
+import importlib
+import asyncio
+import base64
+import copy
 import json
 import logging
 import os
 import re
 import secrets
+import functools
+import hashlib
+import io
+import ipaddress
+import itertools
+import math
+import operator
+import random
 import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Iterator
+from urllib.parse import quote, urlsplit
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request, Depends
-from fastapi.responses import Response, HTMLResponse, FileResponse
+IMPORT_STARTED = time.perf_counter()
+
+import anyio
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request, Depends, Body, WebSocket, WebSocketDisconnect
+from fastapi.requests import HTTPConnection
+from fastapi.responses import Response, HTMLResponse, FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from pydantic import BaseModel
-import httpx
-from gradio_client import Client, handle_file
+from pydantic import BaseModel, ValidationError
+
+# gradio_client and httpx are imported on first use (see lazy_import) so the
+# proxy binds its port without paying for their dependency trees.
+STARTUP_TIMINGS: dict[str, Any] = {"imports": time.perf_counter() - IMPORT_STARTED, "lazy_imports": {}}
 
 DEFAULT_GRADIO_URL = "http://127.0.0.1:7860/"
 GRADIO_URL = os.environ.get("GRADIO_URL", DEFAULT_GRADIO_URL)
@@ -30,6 +60,50 @@ AUTO_LOAD_ENGINE = os.environ.get("AUTO_LOAD_ENGINE", "true").lower() in (
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "")
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "")
+API_KEY_REQUESTS_PER_MINUTE = float(os.environ.get("API_KEY_REQUESTS_PER_MINUTE", "0") or 0)
+API_KEY_CHARS_PER_MINUTE = float(os.environ.get("API_KEY_CHARS_PER_MINUTE", "0") or 0)
+JOB_WORKERS = max(1, int(os.environ.get("JOB_WORKERS", "1") or 1))
+JOB_TTL_SECONDS = float(os.environ.get("JOB_TTL_SECONDS", "86400") or 86400)
+JOB_MAX_DISK_MB = float(os.environ.get("JOB_MAX_DISK_MB", "1024") or 1024)
+JOB_WEBHOOK_ALLOWED_HOSTS = os.environ.get("JOB_WEBHOOK_ALLOWED_HOSTS", "")
+BREAKER_ERROR_RATE = float(os.environ.get("BREAKER_ERROR_RATE", "0.5") or 0.5)
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", "5") or 5)
+BREAKER_WINDOW = int(os.environ.get("BREAKER_WINDOW", "20") or 20)
+BREAKER_OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", "15") or 15)
+BREAKER_PROBE_REUSE_SECONDS = 5.0
+# An empty value means the default; an explicit 0 turns retries off.
+BACKEND_RETRIES = int(os.environ.get("BACKEND_RETRIES") or 2)
+DISCOVERY_CACHE_TTL = float(os.environ.get("DISCOVERY_CACHE_TTL", "60") or 60)
+BACKEND_CONCURRENCY = max(1, int(os.environ.get("BACKEND_CONCURRENCY", "1") or 1))
+ENGINE_CONCURRENCY = os.environ.get("ENGINE_CONCURRENCY", "")
+ADMISSION_TIMEOUT = float(os.environ.get("ADMISSION_TIMEOUT", "300") or 300)
+# An empty value means the default; an explicit 0 means an unbounded queue.
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE") or 64)
+BACKEND_QUEUE_POLL = float(os.environ.get("BACKEND_QUEUE_POLL", "0") or 0)
+BACKEND_QUEUE_MAX = int(os.environ.get("BACKEND_QUEUE_MAX", "2") or 2)
+GRADIO_REPLICAS = os.environ.get("GRADIO_REPLICAS", "")
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "0") or 0)
+HEDGE_MIN_DELAY = float(os.environ.get("HEDGE_MIN_DELAY", "2") or 0)
+HEDGE_BUDGET = float(os.environ.get("HEDGE_BUDGET", "0.1") or 0)
+# Opt-in like request history: cached clips are the spoken input text.
+RESULT_CACHE_MB = float(os.environ.get("RESULT_CACHE_MB", "0") or 0)
+REQUEST_HISTORY_SIZE = int(os.environ.get("REQUEST_HISTORY_SIZE", "0") or 0)
+FANOUT_MIN_CHARS = int(os.environ.get("FANOUT_MIN_CHARS", "2000") or 0)
+FANOUT_SEGMENT_CHARS = max(100, int(os.environ.get("FANOUT_SEGMENT_CHARS", "600") or 600))
+FANOUT_JOIN_MS = float(os.environ.get("FANOUT_JOIN_MS", "250") or 0)
+SYNTHESIS_THREADS = max(1, int(os.environ.get("SYNTHESIS_THREADS", "80") or 80))
+# Synthesis threads kept free beyond what the admission gates can hold, so new
+# requests still reach a gate (and get shed there) and in-flight streams can read.
+SYNTHESIS_SPARE_THREADS = 16
+CONTROL_THREADS = max(1, int(os.environ.get("CONTROL_THREADS", "40") or 40))
+GRADIO_TEMP_MAX_MB = float(os.environ.get("GRADIO_TEMP_MAX_MB", "512") or 512)
+GRADIO_TEMP_MAX_AGE = float(os.environ.get("GRADIO_TEMP_MAX_AGE", "3600") or 3600)
+PRELOAD_GRADIO_CLIENT = os.environ.get("PRELOAD_GRADIO_CLIENT", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
 
 KNOWN_ENGINES = [
     "ChatterboxTTS",
@@ -119,24 +193,41 @@ KITTEN_VOICES = [
     "expr-voice-5-f",
 ]
 
-LOADED_ENGINE = None
+LOADED_ENGINES: dict[str, str] = {}
 DEFAULT_PARAMS = None
 DEFAULT_PARAM_META = None
+NORMALIZED_DEFAULTS = None
 GRADIO_STATUS = {"connected": False, "message": "", "url": GRADIO_URL}
+METADATA_SOURCE: dict[str, Any] = {"source": None, "schema_hash": None, "saved_at": None}
 
 logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger("tts_proxy")
 
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    configure_thread_pools()
+    init_proxy()
+    yield
+    flush_request_history()
+
+
+app = FastAPI(lifespan=lifespan)
 security = HTTPBasic(auto_error=False)
 
 APP_DIR = Path(__file__).resolve().parent
-DATA_DIR = APP_DIR / "data"
-ENV_FILE = APP_DIR.parent / "ENVIRONMENT"
+DATA_DIR = Path(os.environ.get("PROXY_DATA_DIR") or APP_DIR / "data")
+ENV_FILE = Path(os.environ.get("PROXY_ENV_FILE") or APP_DIR.parent / "ENVIRONMENT")
 VOICE_DIR = DATA_DIR / "voices"
 VOICE_INDEX_FILE = DATA_DIR / "voices.json"
 PRESET_FILE = DATA_DIR / "presets.json"
 API_KEY_FILE = DATA_DIR / "api_key.txt"
+API_KEYS_FILE = DATA_DIR / "api_keys.json"
+METADATA_SNAPSHOT_FILE = DATA_DIR / "gradio_metadata.json"
+RESULT_CACHE_DIR = DATA_DIR / "cache"
+REQUEST_HISTORY_FILE = DATA_DIR / "request_history.json"
+JOB_DIR = DATA_DIR / "jobs"
 UI_INDEX = APP_DIR / "ui" / "index.html"
 
 FILE_PARAM_NAMES = {
@@ -263,6 +354,7 @@ def load_voices() -> list[dict]:
 
 def save_voices(voices: list[dict]) -> None:
     save_json(VOICE_INDEX_FILE, voices)
+    bump_data_version()
 
 
 def load_presets() -> list[dict]:
@@ -272,6 +364,47 @@ def load_presets() -> list[dict]:
 
 def save_presets(presets: list[dict]) -> None:
     save_json(PRESET_FILE, presets)
+    bump_data_version()
+
+
+DATA_VERSION_RELOAD_INTERVAL = 2.0
+CHANGE_FEED_POLL_INTERVAL = 0.5
+CHANGE_FEED_MAX_WAIT = 60.0
+CHANGE_FEED_KEEPALIVE = 15.0
+DATA_VERSION_LOCK = threading.Lock()
+# Start from the clock so versions keep moving forward across restarts.
+DATA_VERSION: dict[str, Any] = {"version": int(time.time() * 1000), "signature": None, "checked": None}
+DISCOVERY_PAYLOADS: dict[str, tuple[int, bytes, str]] = {}
+
+
+def data_signature() -> tuple:
+    return file_signature(PRESET_FILE), file_signature(VOICE_INDEX_FILE)
+
+
+def bump_data_version() -> int:
+    """Record a preset, voice or metadata change and drop the prebuilt discovery payloads."""
+    with DATA_VERSION_LOCK:
+        DATA_VERSION["version"] += 1
+        DATA_VERSION["signature"] = data_signature()
+        DATA_VERSION["checked"] = time.monotonic()
+        DISCOVERY_PAYLOADS.clear()
+        return DATA_VERSION["version"]
+
+
+def data_version() -> int:
+    """Current discovery data version; edits made to the JSON stores by hand bump it too."""
+    now = time.monotonic()
+    checked = DATA_VERSION["checked"]
+    if checked is not None and now - checked < DATA_VERSION_RELOAD_INTERVAL:
+        return DATA_VERSION["version"]
+    with DATA_VERSION_LOCK:
+        signature = data_signature()
+        if DATA_VERSION["checked"] is not None and signature != DATA_VERSION["signature"]:
+            DATA_VERSION["version"] += 1
+            DISCOVERY_PAYLOADS.clear()
+        DATA_VERSION["signature"] = signature
+        DATA_VERSION["checked"] = now
+        return DATA_VERSION["version"]
 
 
 def find_preset(name: str) -> Optional[dict]:
@@ -291,6 +424,11 @@ def find_preset_by_label(label: str, engine: Optional[str]) -> Optional[dict]:
     if not target:
         return None
     presets = [preset for preset in load_presets() if preset_label(preset).lower() == target]
+    return pick_labeled_preset(presets, engine)
+
+
+def pick_labeled_preset(presets: list[dict], engine: Optional[str]) -> Optional[dict]:
+    """Among presets sharing a label, the one for ``engine``, else the only one."""
     if not presets:
         return None
     if engine:
@@ -368,41 +506,811 @@ def normalize_gradio_url(url: str, default_url: str = DEFAULT_GRADIO_URL) -> str
     return cleaned
 
 GRADIO_URL = normalize_gradio_url(GRADIO_URL)
-apply_gradio_env_override()
 
-def read_api_key() -> str:
-    if not API_KEY_FILE.exists():
-        return ""
-    return API_KEY_FILE.read_text(encoding="utf-8").strip()
 
+def backend_urls() -> list[str]:
+    """The primary Gradio URL followed by any ``GRADIO_REPLICAS`` serving the same app."""
+    urls = [GRADIO_URL]
+    for item in re.split(r"[,\s]+", GRADIO_REPLICAS):
+        if item.strip():
+            url = normalize_gradio_url(item)
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+LAZY_MODULES: dict[str, Any] = {}
+LAZY_IMPORT_LOCK = threading.Lock()
+GRADIO_CLIENTS: dict[str, Any] = {}
+GRADIO_CLIENTS_LOCK = threading.Lock()
+PROXY_INITIALIZED = False
+
+
+def lazy_import(name: str) -> Any:
+    module = LAZY_MODULES.get(name)
+    if module is not None:
+        return module
+    with LAZY_IMPORT_LOCK:
+        module = LAZY_MODULES.get(name)
+        if module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(name)
+            elapsed = time.perf_counter() - started
+            STARTUP_TIMINGS["lazy_imports"][name] = elapsed
+            LAZY_MODULES[name] = module
+            logger.info("Imported %s in %.0f ms", name, elapsed * 1000)
+    return module
+
+
+def gradio_client(url: Optional[str] = None, download_files: bool = True) -> Any:
+    """A Gradio client for ``url``; synthesis clients (``download_files=False``) are reused.
+
+    Building a client fetches the app config and API info, which is too slow to
+    repeat for every generation.
+    """
+    url = url or GRADIO_URL
+    if download_files:
+        return lazy_import("gradio_client").Client(url)
+    with GRADIO_CLIENTS_LOCK:
+        client = GRADIO_CLIENTS.get(url)
+    if client is None:
+        client = lazy_import("gradio_client").Client(url, download_files=False)
+        with GRADIO_CLIENTS_LOCK:
+            client = GRADIO_CLIENTS.setdefault(url, client)
+    return client
+
+
+def handle_file(path: str) -> Any:
+    return lazy_import("gradio_client").handle_file(path)
+
+
+def preload_heavy_modules() -> None:
+    for name in ("httpx", "gradio_client"):
+        try:
+            lazy_import(name)
+        except ImportError as exc:
+            logger.warning("Failed to preload %s: %s", name, exc)
 
-def write_api_key(value: str) -> None:
-    API_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    API_KEY_FILE.write_text(value.strip() + "\n", encoding="utf-8")
+
+def init_proxy() -> None:
+    global PROXY_INITIALIZED
+    if PROXY_INITIALIZED:
+        return
+    started = time.perf_counter()
+    apply_gradio_env_override()
+    ensure_data_dirs()
+    load_jobs()
+    load_request_history()
+    if restore_metadata_snapshot():
+        schedule_metadata_revalidation()
+    PROXY_INITIALIZED = True
+    STARTUP_TIMINGS["module_to_startup"] = started - IMPORT_STARTED
+    STARTUP_TIMINGS["init"] = time.perf_counter() - started
+    logger.info(
+        "Startup timing: imports %.0f ms, import-to-startup %.0f ms, init %.1f ms (gradio_client %s)",
+        STARTUP_TIMINGS["imports"] * 1000,
+        STARTUP_TIMINGS["module_to_startup"] * 1000,
+        STARTUP_TIMINGS["init"] * 1000,
+        "preloading in background" if PRELOAD_GRADIO_CLIENT else "loads on first use",
+    )
+    if PRELOAD_GRADIO_CLIENT:
+        threading.Thread(target=preload_heavy_modules, name="tts-proxy-preload", daemon=True).start()
+    threading.Thread(target=gradio_temp_janitor, name="tts-temp-janitor", daemon=True).start()
+    if REQUEST_HISTORY_SIZE > 0:
+        threading.Thread(target=request_history_flusher, name="tts-history-flush", daemon=True).start()
+    admission_gate()
+
+API_KEY_RELOAD_INTERVAL = 2.0
+API_KEY_LIMIT_FIELDS = ("requests_per_minute", "chars_per_minute")
+API_KEY_LOCK = threading.Lock()
+API_KEY_REGISTRY: dict[str, Any] = {"entries": [], "by_digest": {}, "signature": None, "checked": None}
+API_KEY_BUCKETS: dict[str, dict] = {}
+
+
+def file_signature(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def key_digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode("utf-8")).digest()
+
+
+def load_api_keys() -> list[dict]:
+    if API_KEYS_FILE.exists():
+        entries = load_json(API_KEYS_FILE, [])
+        return [entry for entry in entries if isinstance(entry, dict) and entry.get("key")]
+    if API_KEY_FILE.exists():
+        legacy = API_KEY_FILE.read_text(encoding="utf-8").strip()
+        if legacy:
+            return [{"name": "default", "key": legacy, "created_at": now_iso()}]
+    return []
+
+
+def save_api_keys(entries: list[dict]) -> None:
+    save_json(API_KEYS_FILE, entries)
+    if API_KEY_FILE.exists():
+        API_KEY_FILE.unlink()
+    keys = {entry["key"] for entry in entries}
+    with API_KEY_LOCK:
+        API_KEY_REGISTRY["checked"] = None
+        # Revoked and rotated keys can no longer be used, so their buckets go too.
+        for key in [key for key in API_KEY_BUCKETS if key not in keys]:
+            del API_KEY_BUCKETS[key]
+
+
+def api_key_registry() -> dict:
+    """Return the in-memory key registry, re-reading the store only when it changed."""
+    global API_KEY_REGISTRY
+    registry = API_KEY_REGISTRY
+    now = time.monotonic()
+    if registry["checked"] is not None and now - registry["checked"] < API_KEY_RELOAD_INTERVAL:
+        return registry
+    with API_KEY_LOCK:
+        signature = (file_signature(API_KEYS_FILE), file_signature(API_KEY_FILE))
+        if API_KEY_REGISTRY["checked"] is not None and signature == API_KEY_REGISTRY["signature"]:
+            API_KEY_REGISTRY["checked"] = now
+            return API_KEY_REGISTRY
+        entries = load_api_keys()
+        API_KEY_REGISTRY = {
+            "entries": entries,
+            "by_digest": {key_digest(entry["key"]): entry for entry in entries},
+            "signature": signature,
+            "checked": now,
+        }
+        return API_KEY_REGISTRY
 
 
 def get_api_key() -> str:
-    return read_api_key()
+    entries = api_key_registry()["entries"]
+    for entry in entries:
+        if entry.get("name") == "default":
+            return entry["key"]
+    return entries[0]["key"] if entries else ""
 
 
-def require_api_key(request: Request) -> None:
-    api_key = get_api_key()
-    if not api_key:
-        return
+def public_api_key(entry: dict) -> dict:
+    return {
+        "name": entry.get("name"),
+        "key": entry.get("key"),
+        "created_at": entry.get("created_at"),
+        "requests_per_minute": entry.get("requests_per_minute"),
+        "chars_per_minute": entry.get("chars_per_minute"),
+    }
+
+
+def parse_key_limits(payload: dict) -> dict:
+    limits = {}
+    for field in API_KEY_LIMIT_FIELDS:
+        value = payload.get(field)
+        if value in (None, ""):
+            continue
+        try:
+            limit = float(value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"{field} must be a number")
+        if limit < 0:
+            raise HTTPException(status_code=400, detail=f"{field} must be >= 0")
+        limits[field] = limit
+    return limits
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per minute up to a burst of ``capacity`` tokens.
+
+    The burst is one minute's worth, but at least one token so that fractional
+    request rates still admit a request now and then.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+def key_limit(entry: dict, field: str, default: float) -> float:
+    value = entry.get(field)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def consume_rate_limit(entry: dict, chars: int) -> None:
+    limits = {
+        "requests": key_limit(entry, "requests_per_minute", API_KEY_REQUESTS_PER_MINUTE),
+        "chars": key_limit(entry, "chars_per_minute", API_KEY_CHARS_PER_MINUTE),
+    }
+    amounts = {"requests": 1, "chars": chars}
+    with API_KEY_LOCK:
+        buckets = API_KEY_BUCKETS.get(entry["key"])
+        if buckets is None or buckets["limits"] != limits:
+            buckets = {"limits": limits}
+            for kind, rate in limits.items():
+                if rate > 0:
+                    buckets[kind] = TokenBucket(rate)
+            API_KEY_BUCKETS[entry["key"]] = buckets
+        chars_bucket = buckets.get("chars")
+        if chars_bucket is not None and chars > chars_bucket.capacity:
+            # It would never fit, so waiting and retrying cannot help.
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"Input of {chars} characters exceeds the limit of {chars_bucket.capacity:g} "
+                    f"characters per minute for API key '{entry.get('name')}'"
+                ),
+            )
+        now = time.monotonic()
+        wait = 0.0
+        for kind in ("requests", "chars"):
+            bucket = buckets.get(kind)
+            if bucket is not None and amounts[kind] > 0:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_time(amounts[kind]))
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded for API key '{entry.get('name')}'",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        for kind in ("requests", "chars"):
+            bucket = buckets.get(kind)
+            if bucket is not None and amounts[kind] > 0:
+                bucket.take(amounts[kind])
+
+
+def require_api_key(
+    request: HTTPConnection, chars: int = 0, token: Optional[str] = None, metered: bool = True
+) -> Optional[str]:
+    """Check the caller's key and take its rate-limit tokens; ``metered=False`` only checks.
+
+    Read-only discovery and the change feed are unmetered so a UI that polls them
+    does not use up the quota it needs for synthesis.
+    """
+    registry = api_key_registry()
+    if not registry["entries"]:
+        return None
     auth_header = request.headers.get("authorization", "")
-    token = ""
-    if auth_header.lower().startswith("bearer "):
+    token = (token or "").strip()
+    if not token and auth_header.lower().startswith("bearer "):
         token = auth_header.split(" ", 1)[1].strip()
     if not token:
         token = request.headers.get("x-api-key", "").strip()
-    if token != api_key:
+    entry = registry["by_digest"].get(key_digest(token)) if token else None
+    if entry is None or not secrets.compare_digest(entry["key"].encode("utf-8"), token.encode("utf-8")):
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
+    if metered:
+        consume_rate_limit(entry, chars)
+    return entry.get("name")
 
 def reset_gradio_cache() -> None:
-    global DEFAULT_PARAMS, DEFAULT_PARAM_META, LOADED_ENGINE
+    global DEFAULT_PARAMS, DEFAULT_PARAM_META, NORMALIZED_DEFAULTS
     DEFAULT_PARAMS = None
     DEFAULT_PARAM_META = None
-    LOADED_ENGINE = None
+    NORMALIZED_DEFAULTS = None
+    METADATA_SOURCE.update(source=None, schema_hash=None, saved_at=None)
+    LOADED_ENGINES.clear()
+    with GRADIO_CLIENTS_LOCK:
+        GRADIO_CLIENTS.clear()
+    for url in backend_urls():
+        backend_breaker(url).reset()
+    DISCOVERY_CACHE.clear()
+    bump_data_version()
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker for one Gradio backend.
+
+    Closed: calls flow and outcomes are recorded in a rolling window. Open: calls
+    fail fast until ``open_seconds`` pass. Half-open: a single caller probes
+    ``/gradio_api/info``; success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.state = "closed"
+            self.outcomes: deque = deque(maxlen=max(1, BREAKER_WINDOW))
+            self.opened_at: Optional[float] = None
+            self.probing = False
+            self.probe_info: Optional[tuple[float, dict]] = None
+            self.last_error = ""
+
+    def trip(self, error: str) -> None:
+        if self.state != "open":
+            logger.warning("Circuit opened for %s: %s", self.url, error)
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.last_error = error
+
+    def succeeded(self) -> None:
+        if self.state != "closed":
+            logger.info("Circuit closed for %s", self.url)
+            self.outcomes.clear()
+            self.last_error = ""
+        self.outcomes.append(True)
+        self.state = "closed"
+        self.opened_at = None
+
+    def failed(self, error: str, trip: bool) -> None:
+        self.outcomes.append(False)
+        failures = self.outcomes.count(False)
+        rate = failures / len(self.outcomes)
+        if trip or self.state == "half_open" or (
+            len(self.outcomes) >= BREAKER_MIN_CALLS and rate >= BREAKER_ERROR_RATE
+        ):
+            self.trip(error)
+        else:
+            self.last_error = error
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.succeeded()
+
+    def record_failure(self, error: str, trip: bool = False) -> None:
+        with self.lock:
+            self.failed(error, trip)
+
+    def take_probe_info(self) -> Optional[dict]:
+        """The ``/gradio_api/info`` body from a probe in the last few seconds, once."""
+        with self.lock:
+            probe, self.probe_info = self.probe_info, None
+        if probe and time.monotonic() - probe[0] < BREAKER_PROBE_REUSE_SECONDS:
+            return probe[1]
+        return None
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 1
+        remaining = BREAKER_OPEN_SECONDS - (time.monotonic() - self.opened_at)
+        return max(1, math.ceil(remaining))
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.probing:
+                return False
+            if time.monotonic() - (self.opened_at or 0) < BREAKER_OPEN_SECONDS:
+                return False
+            self.state = "half_open"
+            self.probing = True
+        info = None
+        try:
+            info = probe_backend(self.url)
+        finally:
+            # The outcome and the end of probing are one step, so no other caller
+            # can slip in and start a second probe in between.
+            with self.lock:
+                self.probing = False
+                if info is not None:
+                    self.probe_info = (time.monotonic(), info)
+                    self.succeeded()
+                else:
+                    self.failed("Half-open probe failed", False)
+        return info is not None
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            calls = len(self.outcomes)
+            failures = self.outcomes.count(False)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failures": failures,
+                "error_rate": round(failures / calls, 3) if calls else 0.0,
+                "retry_after": self.retry_after() if self.state != "closed" else None,
+                "last_error": self.last_error,
+            }
+
+
+BREAKERS: dict[str, CircuitBreaker] = {}
+BREAKERS_LOCK = threading.Lock()
+
+
+def backend_breaker(url: Optional[str] = None) -> CircuitBreaker:
+    url = url or GRADIO_URL
+    with BREAKERS_LOCK:
+        breaker = BREAKERS.get(url)
+        if breaker is None:
+            breaker = BREAKERS[url] = CircuitBreaker(url)
+        return breaker
+
+
+def probe_backend(url: str) -> Optional[dict]:
+    """Fetch the backend's API info; returns it, or None when the backend is unhealthy."""
+    try:
+        resp = lazy_import("httpx").get(f"{url.rstrip('/')}/gradio_api/info?serialize=False", timeout=3.0)
+        resp.raise_for_status()
+        return resp.json()
+    except Exception as exc:
+        logger.info("Backend probe for %s failed: %s", url, exc)
+        return None
+
+
+def require_backend(url: Optional[str] = None) -> CircuitBreaker:
+    breaker = backend_breaker(url)
+    if not breaker.allow():
+        raise HTTPException(
+            status_code=503,
+            detail=f"Gradio backend unavailable ({breaker.last_error or 'circuit open'}). Retry later.",
+            headers={"Retry-After": str(breaker.retry_after())},
+        )
+    return breaker
+
+
+def parse_engine_limits(value: str) -> dict[str, int]:
+    """Parse ``ENGINE_CONCURRENCY`` (``"Kokoro TTS=2,F5-TTS=1"``)."""
+    limits = {}
+    for item in re.split(r"[,;]", value or ""):
+        engine, _, limit = item.partition("=")
+        if engine.strip() and limit.strip().isdigit() and int(limit) > 0:
+            limits[engine.strip()] = int(limit)
+    return limits
+
+
+ENGINE_LIMITS = parse_engine_limits(ENGINE_CONCURRENCY)
+ADMISSION_CHECK_INTERVAL = 0.5
+
+
+class RequestCancelled(HTTPException):
+    def __init__(self, detail: str = "Request cancelled while queued") -> None:
+        super().__init__(status_code=499, detail=detail)
+
+
+class AdmissionGate:
+    """Concurrency gate in front of one Gradio backend.
+
+    At most ``BACKEND_CONCURRENCY`` generations (and ``ENGINE_LIMITS`` per engine)
+    are in flight; everything else waits here, first come first served, where it
+    can be cancelled or shed instead of piling up in Gradio's queue. With
+    ``BACKEND_QUEUE_POLL`` set, admissions also pause while Gradio itself reports
+    ``BACKEND_QUEUE_MAX`` or more queued events (e.g. from its own web UI).
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.cond = threading.Condition()
+        self.tickets = itertools.count()
+        self.waiters: list[tuple[int, str]] = []
+        self.in_flight = 0
+        self.engine_in_flight: dict[str, int] = {}
+        self.admitted = 0
+        self.shed = {"full": 0, "timeout": 0, "cancelled": 0}
+        self.waits: deque = deque(maxlen=256)
+        self.service_times: deque = deque(maxlen=64)
+        self.backend_queue: Optional[int] = None
+        self.poller: Optional[threading.Thread] = None
+
+    def has_room(self, engine: str) -> bool:
+        if self.in_flight >= BACKEND_CONCURRENCY:
+            return False
+        limit = ENGINE_LIMITS.get(engine)
+        if limit and self.engine_in_flight.get(engine, 0) >= limit:
+            return False
+        return self.backend_queue is None or self.backend_queue < BACKEND_QUEUE_MAX
+
+    def admissible(self, ticket: tuple[int, str]) -> bool:
+        # An earlier waiter goes first unless its own engine limit holds it back.
+        for waiter in self.waiters:
+            if waiter == ticket:
+                return self.has_room(ticket[1])
+            if self.has_room(waiter[1]):
+                return False
+        return False
+
+    def estimate_wait(self, position: int) -> float:
+        service = statistics.median(self.service_times) if self.service_times else 5.0
+        return service * (position + 1) / BACKEND_CONCURRENCY
+
+    def retry_after(self) -> int:
+        return max(1, min(120, math.ceil(self.estimate_wait(len(self.waiters)))))
+
+    def shed_error(self, reason: str, detail: str) -> HTTPException:
+        self.shed[reason] += 1
+        return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(self.retry_after())})
+
+    def acquire(self, engine: str, cancelled=None, report=None) -> float:
+        """Wait for a slot and return the seconds spent queued.
+
+        ``report`` (if given) receives a ``speech.queue`` event with this request's
+        place in line each time it is re-checked.
+        """
+        started = time.monotonic()
+        deadline = started + ADMISSION_TIMEOUT
+        with self.cond:
+            if ADMISSION_MAX_QUEUE and len(self.waiters) >= ADMISSION_MAX_QUEUE:
+                raise self.shed_error("full", "Too many requests waiting for the TTS backend. Retry later.")
+            ticket = (next(self.tickets), engine)
+            self.waiters.append(ticket)
+        try:
+            while True:
+                with self.cond:
+                    if self.admissible(ticket):
+                        self.waiters.remove(ticket)
+                        self.in_flight += 1
+                        self.engine_in_flight[engine] = self.engine_in_flight.get(engine, 0) + 1
+                        self.admitted += 1
+                        waited = time.monotonic() - started
+                        self.waits.append(waited)
+                        return waited
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self.shed_error("timeout", "Timed out waiting for the TTS backend. Retry later.")
+                    position = self.waiters.index(ticket)
+                    event = {
+                        "type": "speech.queue",
+                        "stage": "proxy",
+                        "position": position,
+                        "queue_size": len(self.waiters),
+                        "eta": round(self.estimate_wait(position), 1),
+                    }
+                    self.cond.wait(min(remaining, ADMISSION_CHECK_INTERVAL))
+                if report is not None:
+                    report(event)
+                # Checked outside the lock: for HTTP requests this round-trips the event loop.
+                if cancelled is not None and cancelled():
+                    with self.cond:
+                        self.shed["cancelled"] += 1
+                    raise RequestCancelled()
+        finally:
+            with self.cond:
+                if ticket in self.waiters:
+                    self.waiters.remove(ticket)
+                self.cond.notify_all()
+
+    def release(self, engine: str, service_time: float) -> None:
+        with self.cond:
+            self.in_flight -= 1
+            self.engine_in_flight[engine] -= 1
+            self.service_times.append(service_time)
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self, engine: str, cancelled=None, report=None) -> Iterator[float]:
+        waited = self.acquire(engine, cancelled, report)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(engine, time.monotonic() - started)
+
+    def start_poller(self) -> None:
+        if BACKEND_QUEUE_POLL <= 0 or self.poller is not None:
+            return
+        with self.cond:
+            if self.poller is None:
+                self.poller = threading.Thread(target=self.poll_backend_queue, name="tts-queue-poll", daemon=True)
+                self.poller.start()
+
+    def poll_backend_queue(self) -> None:
+        # Runs until the URL is no longer one of the configured backends.
+        while self.url in backend_urls():
+            queue_size = None
+            try:
+                resp = backend_http().get(f"{self.url.rstrip('/')}/gradio_api/queue/status", timeout=3.0)
+                resp.raise_for_status()
+                queue_size = int(resp.json().get("queue_size") or 0)
+            except Exception as exc:
+                logger.debug("Queue status poll for %s failed: %s", self.url, exc)
+            with self.cond:
+                self.backend_queue = queue_size
+                self.cond.notify_all()
+            time.sleep(BACKEND_QUEUE_POLL)
+        with self.cond:
+            self.poller = None
+            self.backend_queue = None
+
+    def snapshot(self) -> dict:
+        with self.cond:
+            waits = sorted(self.waits)
+
+            def wait_ms(pct: float) -> Optional[float]:
+                if not waits:
+                    return None
+                return round(waits[min(len(waits) - 1, int(pct * len(waits)))] * 1000, 1)
+
+            return {
+                "limit": BACKEND_CONCURRENCY,
+                "engine_limits": ENGINE_LIMITS,
+                "in_flight": self.in_flight,
+                "engine_in_flight": {engine: count for engine, count in self.engine_in_flight.items() if count},
+                "waiting": len(self.waiters),
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "queue_wait_ms": {"p50": wait_ms(0.5), "p95": wait_ms(0.95), "max": wait_ms(1.0)},
+                "backend_queue": self.backend_queue,
+            }
+
+
+ADMISSION_GATES: dict[str, AdmissionGate] = {}
+ADMISSION_GATES_LOCK = threading.Lock()
+
+
+def admission_gate(url: Optional[str] = None) -> AdmissionGate:
+    url = url or GRADIO_URL
+    with ADMISSION_GATES_LOCK:
+        gate = ADMISSION_GATES.get(url)
+        if gate is None:
+            gate = ADMISSION_GATES[url] = AdmissionGate(url)
+    gate.start_poller()
+    return gate
+
+
+SYNTHESIS_LIMITER: Optional[anyio.CapacityLimiter] = None
+
+
+def configure_thread_pools() -> None:
+    """Give synthesis its own worker threads so it cannot starve the control plane.
+
+    Sync endpoints (admin, UI, discovery) keep AnyIO's default limiter, sized to
+    ``CONTROL_THREADS``; speech work runs through ``run_synthesis`` on a separate
+    ``SYNTHESIS_THREADS`` limiter. Must run inside the event loop.
+    """
+    global SYNTHESIS_LIMITER
+    anyio.to_thread.current_default_thread_limiter().total_tokens = CONTROL_THREADS
+    SYNTHESIS_LIMITER = anyio.CapacityLimiter(synthesis_thread_count())
+
+
+def synthesis_thread_count() -> int:
+    """``SYNTHESIS_THREADS``, raised to cover every request the admission gates can hold.
+
+    Requests wait for admission on a synthesis thread. If the gates could hold more
+    than the limiter allows, later requests would queue inside AnyIO instead, where
+    they are neither shed nor timed out and stall chunk reads of running streams.
+    """
+    if not ADMISSION_MAX_QUEUE:
+        logger.warning("ADMISSION_MAX_QUEUE=0: waiting requests can use up all synthesis threads")
+        return SYNTHESIS_THREADS
+    held = len(backend_urls()) * (BACKEND_CONCURRENCY + ADMISSION_MAX_QUEUE)
+    return max(SYNTHESIS_THREADS, held + SYNTHESIS_SPARE_THREADS)
+
+
+def synthesis_limiter() -> anyio.CapacityLimiter:
+    global SYNTHESIS_LIMITER
+    if SYNTHESIS_LIMITER is None:
+        SYNTHESIS_LIMITER = anyio.CapacityLimiter(synthesis_thread_count())
+    return SYNTHESIS_LIMITER
+
+
+async def run_synthesis(func, *args) -> Any:
+    return await anyio.to_thread.run_sync(func, *args, limiter=synthesis_limiter())
+
+
+# Threads outside AnyIO's pools that are currently doing work for a request
+# (hedged attempts, fan-out segments, speech jobs), by ident with a nesting count.
+# The sampling profiler only looks at these, the AnyIO workers and the event loop.
+REQUEST_THREADS: dict[int, int] = {}
+REQUEST_THREADS_LOCK = threading.Lock()
+
+
+def serving_request(func):
+    """Wrap ``func`` so the thread running it counts as serving a request while it runs."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        ident = threading.get_ident()
+        with REQUEST_THREADS_LOCK:
+            REQUEST_THREADS[ident] = REQUEST_THREADS.get(ident, 0) + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with REQUEST_THREADS_LOCK:
+                if REQUEST_THREADS[ident] > 1:
+                    REQUEST_THREADS[ident] -= 1
+                else:
+                    del REQUEST_THREADS[ident]
+
+    return wrapper
+
+
+async def run_control(func, *args, **kwargs) -> Any:
+    """Run a short blocking call (key checks, small file reads) on the control threads, off the event loop."""
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+
+async def iterate_synthesis(iterator: Iterator[bytes]) -> Any:
+    """Async wrapper for a blocking chunk iterator that reads on the synthesis threads."""
+    done = object()
+    while True:
+        chunk = await run_synthesis(next, iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def limiter_snapshot(limiter: anyio.CapacityLimiter) -> dict:
+    stats = limiter.statistics()
+    return {"threads": int(limiter.total_tokens), "busy": stats.borrowed_tokens, "waiting": stats.tasks_waiting}
+
+
+def is_backend_failure(exc: Exception) -> bool:
+    """Errors raised by the Gradio app itself mean the backend is up and answering."""
+    return type(exc).__name__ not in ("AppError", "ValueError", "TypeError")
+
+
+def retry_idempotent(func, attempts: Optional[int] = None, base_delay: float = 0.25):
+    """Run an idempotent metadata call with full-jitter exponential backoff."""
+    attempts = (BACKEND_RETRIES if attempts is None else attempts) + 1
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(random.uniform(0, base_delay * (2 ** attempt)))
+
+
+class TTLCache:
+    """Stale-while-revalidate cache: expired entries are served while a background refresh runs.
+
+    Callers get their own deep copy, so editing a result never changes the cached value.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.entries: dict[Any, tuple[Any, float]] = {}
+        self.refreshing: set = set()
+        self.lock = threading.Lock()
+
+    def get(self, key: Any, loader, cacheable=bool) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            return self.load(key, loader, cacheable)
+        value, expires = entry
+        if time.monotonic() >= expires:
+            with self.lock:
+                start = key not in self.refreshing
+                self.refreshing.add(key)
+            if start:
+                threading.Thread(
+                    target=self.refresh, args=(key, loader, cacheable), name="tts-cache-refresh", daemon=True
+                ).start()
+        return copy.deepcopy(value)
+
+    def load(self, key: Any, loader, cacheable) -> Any:
+        value = loader()
+        if cacheable(value):
+            with self.lock:
+                self.entries[key] = (value, time.monotonic() + self.ttl)
+        return copy.deepcopy(value)
+
+    def refresh(self, key: Any, loader, cacheable) -> None:
+        try:
+            self.load(key, loader, cacheable)
+        except Exception:
+            logger.exception("Background refresh failed for %s", key)
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+DISCOVERY_CACHE = TTLCache(DISCOVERY_CACHE_TTL)
 
 def extract_description(param: dict) -> str:
     type_field = param.get("type")
@@ -439,6 +1347,7 @@ class OpenAITTSSpeechRequest(BaseModel):
     voice: Optional[str] = None
     response_format: Optional[str] = None
     speed: Optional[float] = None
+    stream_format: Optional[str] = None
 
 
 def resolve_engine(req: OpenAITTSSpeechRequest, preset: Optional[dict]) -> str:
@@ -482,15 +1391,27 @@ def extract_choices(param: dict) -> list:
 def fetch_default_params() -> tuple[dict, dict, str, bool]:
     base_url = GRADIO_URL.rstrip("/")
     info_url = f"{base_url}/gradio_api/info?serialize=False"
-    try:
-        resp = httpx.get(info_url, timeout=10.0)
-        resp.raise_for_status()
-    except Exception as exc:
-        message = f"Gradio API not reachable at {GRADIO_URL}. Start the TTS service and click Reconnect."
-        logger.warning("Failed to fetch Gradio info: %s", exc)
+    breaker = backend_breaker()
+    if not breaker.allow():
+        message = f"Gradio API not reachable at {GRADIO_URL} (circuit open, retry in {breaker.retry_after()}s)."
         return {}, {}, message, False
-
-    data = resp.json()
+    def fetch_info():
+        info_resp = lazy_import("httpx").get(info_url, timeout=10.0)
+        info_resp.raise_for_status()
+        return info_resp
+
+    # A half-open probe inside allow() may have just fetched the same document.
+    data = breaker.take_probe_info()
+    if data is None:
+        try:
+            resp = retry_idempotent(fetch_info)
+        except Exception as exc:
+            message = f"Gradio API not reachable at {GRADIO_URL}. Start the TTS service and click Reconnect."
+            logger.warning("Failed to fetch Gradio info: %s", exc)
+            breaker.record_failure(str(exc), trip=True)
+            return {}, {}, message, False
+        breaker.record_success()
+        data = resp.json()
     endpoints = data.get("named_endpoints") or {}
     endpoint = endpoints.get(GRADIO_API_NAME)
     if not endpoint:
@@ -548,7 +1469,7 @@ def get_engine_choices_from_meta() -> list[str]:
     return []
 
 
-def list_supported_engines() -> list[str]:
+def load_supported_engines() -> list[str]:
     engines = list(KNOWN_ENGINES)
     for choice in get_engine_choices_from_meta():
         if choice not in engines:
@@ -556,6 +1477,11 @@ def list_supported_engines() -> list[str]:
     return engines
 
 
+def list_supported_engines() -> list[str]:
+    # Only cache once metadata loaded, so engines from a late-starting backend show up.
+    return DISCOVERY_CACHE.get((GRADIO_URL, "engines"), load_supported_engines, lambda _: bool(DEFAULT_PARAM_META))
+
+
 def coerce_value(value, python_type: Optional[str]):
     if value is None or python_type is None:
         return value
@@ -592,14 +1518,124 @@ def is_numeric_string(value: str) -> bool:
     return bool(re.match(r"^\s*-?\d+(\.\d+)?([eE][-+]?\d+)?\s*$", value))
 
 
+METADATA_REVALIDATE_INTERVAL = 5.0
+METADATA_LOCK = threading.Lock()
+METADATA_REVALIDATION = {"running": False}
+
+
+def metadata_schema_hash(meta: dict) -> str:
+    payload = json.dumps({"api_name": GRADIO_API_NAME, "params": meta}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_metadata_snapshot(url: str) -> Optional[dict]:
+    entry = load_json(METADATA_SNAPSHOT_FILE, {}).get(url)
+    if not isinstance(entry, dict) or entry.get("api_name") != GRADIO_API_NAME:
+        return None
+    if not isinstance(entry.get("meta"), dict) or not entry["meta"] or not isinstance(entry.get("defaults"), dict):
+        return None
+    return entry
+
+
+def save_metadata_snapshot(url: str, defaults: dict, meta: dict, schema_hash: str) -> None:
+    """Keep the last good metadata per backend; the file is only rewritten when the schema changes."""
+    with METADATA_LOCK:
+        snapshots = load_json(METADATA_SNAPSHOT_FILE, {})
+        if not isinstance(snapshots, dict):
+            snapshots = {}
+        current = snapshots.get(url) or {}
+        if current.get("schema_hash") == schema_hash and current.get("api_name") == GRADIO_API_NAME:
+            return
+        snapshots[url] = {
+            "api_name": GRADIO_API_NAME,
+            "schema_hash": schema_hash,
+            "saved_at": now_iso(),
+            "defaults": defaults,
+            "meta": meta,
+        }
+        save_json(METADATA_SNAPSHOT_FILE, snapshots)
+    logger.info("Saved Gradio metadata snapshot for %s (schema %s)", url, schema_hash)
+
+
+def install_metadata(defaults: dict, meta: dict, message: str, connected: bool) -> None:
+    global DEFAULT_PARAMS, DEFAULT_PARAM_META, NORMALIZED_DEFAULTS, GRADIO_STATUS
+    changed = meta != DEFAULT_PARAM_META
+    DEFAULT_PARAMS = defaults
+    DEFAULT_PARAM_META = meta
+    NORMALIZED_DEFAULTS = None
+    if changed:
+        DISCOVERY_CACHE.clear()
+        bump_data_version()
+    GRADIO_STATUS = {"connected": connected, "message": message, "url": GRADIO_URL}
+
+
+def restore_metadata_snapshot(message: str = "") -> bool:
+    """Serve the saved metadata for the current backend until a live fetch succeeds."""
+    snapshot = load_metadata_snapshot(GRADIO_URL)
+    if not snapshot:
+        return False
+    note = f"Using metadata saved {snapshot.get('saved_at')}; waiting for Gradio at {GRADIO_URL}."
+    install_metadata(snapshot["defaults"], snapshot["meta"], f"{message} {note}".strip(), False)
+    METADATA_SOURCE.update(source="snapshot", schema_hash=snapshot.get("schema_hash"), saved_at=snapshot.get("saved_at"))
+    return True
+
+
+def refresh_metadata() -> None:
+    global GRADIO_STATUS
+    defaults, meta, message, connected = fetch_default_params()
+    if connected:
+        schema_hash = metadata_schema_hash(meta)
+        install_metadata(defaults, meta, message, connected)
+        METADATA_SOURCE.update(source="live", schema_hash=schema_hash, saved_at=None)
+        save_metadata_snapshot(GRADIO_URL, defaults, meta, schema_hash)
+        return
+    if METADATA_SOURCE["source"] == "snapshot" and DEFAULT_PARAM_META:
+        # Keep serving the snapshot; only the status message changes.
+        note = f"Using metadata saved {METADATA_SOURCE['saved_at']}."
+        GRADIO_STATUS = {"connected": False, "message": f"{message} {note}", "url": GRADIO_URL}
+        return
+    if not restore_metadata_snapshot(message):
+        install_metadata(defaults, meta, message, connected)
+
+
+def schedule_metadata_revalidation() -> None:
+    with METADATA_LOCK:
+        if METADATA_REVALIDATION["running"]:
+            return
+        METADATA_REVALIDATION["running"] = True
+    threading.Thread(target=revalidate_metadata, name="tts-metadata-refresh", daemon=True).start()
+
+
+def revalidate_metadata() -> None:
+    # Retries until the backend answers (the circuit breaker spaces out real fetches).
+    try:
+        while METADATA_SOURCE["source"] == "snapshot":
+            try:
+                refresh_metadata()
+            except Exception:
+                logger.exception("Background metadata refresh failed")
+            if METADATA_SOURCE["source"] == "snapshot":
+                time.sleep(METADATA_REVALIDATE_INTERVAL)
+    finally:
+        with METADATA_LOCK:
+            METADATA_REVALIDATION["running"] = False
+
+
 def get_default_params(force_refresh: bool = False) -> dict:
-    global DEFAULT_PARAMS, DEFAULT_PARAM_META, GRADIO_STATUS
+    global NORMALIZED_DEFAULTS
     if force_refresh or DEFAULT_PARAMS is None or DEFAULT_PARAM_META is None or not DEFAULT_PARAMS:
-        defaults, meta, message, connected = fetch_default_params()
-        DEFAULT_PARAMS = defaults
-        DEFAULT_PARAM_META = meta
-        GRADIO_STATUS = {"connected": connected, "message": message, "url": GRADIO_URL}
-    defaults = DEFAULT_PARAMS.copy()
+        refresh_metadata()
+    elif METADATA_SOURCE["source"] == "snapshot":
+        schedule_metadata_revalidation()
+    normalized = NORMALIZED_DEFAULTS
+    if normalized is None:
+        normalized = NORMALIZED_DEFAULTS = normalize_defaults(DEFAULT_PARAMS, DEFAULT_PARAM_META)
+    return normalized.copy()
+
+
+def normalize_defaults(raw: dict, param_meta: dict) -> dict:
+    """Turn Gradio's raw defaults into values the API accepts; runs once per metadata load."""
+    defaults = raw.copy()
     for key, value in defaults.items():
         if value == "" and (
             key in FILE_PARAM_NAMES
@@ -609,7 +1645,7 @@ def get_default_params(force_refresh: bool = False) -> dict:
             defaults[key] = None
         if value == "" and key.endswith("_language"):
             defaults[key] = "en"
-        meta = DEFAULT_PARAM_META.get(key, {})
+        meta = param_meta.get(key, {})
         component = meta.get("component")
         if value == "" and component == "Checkbox":
             defaults[key] = False
@@ -656,6 +1692,10 @@ def get_default_params(force_refresh: bool = False) -> dict:
 
 
 def list_param_specs(engine: Optional[str] = None) -> list[dict]:
+    return DISCOVERY_CACHE.get((GRADIO_URL, "param_specs", engine), lambda: load_param_specs(engine))
+
+
+def load_param_specs(engine: Optional[str] = None) -> list[dict]:
     defaults = get_default_params()
     meta = DEFAULT_PARAM_META or {}
     params: list[dict] = []
@@ -690,17 +1730,30 @@ def list_param_specs(engine: Optional[str] = None) -> list[dict]:
 
 
 def fetch_kokoro_voice_choices() -> list[str]:
+    breaker = backend_breaker()
+    if not breaker.allow():
+        return []
     try:
-        client = Client(GRADIO_URL)
-        voices = client.predict(api_name="/refresh_kokoro_voice_list")
+        voices = retry_idempotent(lambda: gradio_client().predict(api_name="/refresh_kokoro_voice_list"))
+        breaker.record_success()
         if isinstance(voices, list):
             return [str(v) for v in voices]
     except Exception as exc:
         logger.warning("Failed to fetch Kokoro voices: %s", exc)
+        if is_backend_failure(exc):
+            breaker.record_failure(str(exc))
     return []
 
 
 def fetch_voice_choices(engine: str) -> dict:
+    return DISCOVERY_CACHE.get(
+        (GRADIO_URL, "voice_choices", engine),
+        lambda: load_voice_choices(engine),
+        lambda value: bool(value["choices"]),
+    )
+
+
+def load_voice_choices(engine: str) -> dict:
     def meta_choices(param_name: str) -> list[str]:
         if DEFAULT_PARAM_META is None or not DEFAULT_PARAM_META:
             get_default_params()
@@ -725,9 +1778,1742 @@ def fetch_voice_choices(engine: str) -> dict:
     return {"param": "", "choices": []}
 
 
+PRESET_PLANS: dict[str, Any] = {"version": None, "plans": {}, "presets": {}, "labels": {}, "voices": {}, "voice_files": {}}
+PRESET_PLANS_LOCK = threading.Lock()
+
+
+def is_file_param(key: str) -> bool:
+    return key in FILE_PARAM_NAMES or key.endswith("_ref_audio") or key.endswith("_emotion_audio")
+
+
+def compile_plan(preset: Optional[dict], strict: bool = False) -> dict:
+    """Build the ready-to-send Gradio params for a preset, or for bare defaults.
+
+    Defaults are normalized, preset params overlaid and file references resolved
+    once here, so a request only adds its text and format. With ``strict`` (saving
+    a preset) unknown params and missing reference files raise 400; presets saved
+    earlier get a warning and fall back to the defaults for those params instead,
+    so a Gradio update does not break them. Raises 400 when the preset could never
+    produce a valid call.
+    """
+    params = get_default_params()
+    engine = preset.get("engine") if preset else None
+    name = preset.get("name") if preset else None
+    preset_params = {}
+    if preset and isinstance(preset.get("params"), dict):
+        preset_params = dict(preset["params"])
+    if preset_params and DEFAULT_PARAM_META:
+        unknown = sorted(key for key in preset_params if key not in DEFAULT_PARAM_META)
+        if unknown and strict:
+            raise HTTPException(status_code=400, detail=f"Unknown params for {GRADIO_API_NAME}: {', '.join(unknown)}")
+        if unknown:
+            logger.warning("Preset %s: ignoring params unknown to %s: %s", name, GRADIO_API_NAME, ", ".join(unknown))
+            for key in unknown:
+                preset_params.pop(key)
+    params.update(preset_params)
+
+    if preset and preset.get("voice_id"):
+        ref_param = ENGINE_REF_PARAM.get(engine)
+        voice = find_voice(preset["voice_id"])
+        if ref_param and voice:
+            params[ref_param] = str(resolve_voice_path(voice))
+
+    for key, value in list(params.items()):
+        if not is_file_param(key):
+            continue
+        resolved = resolve_voice_reference(value) if isinstance(value, str) else None
+        if resolved:
+            params[key] = handle_file(resolved)
+        elif value in ("", None):
+            params[key] = None
+        elif preset and isinstance(value, str) and strict:
+            raise HTTPException(status_code=400, detail=f"Reference audio for {key} not found: {value}")
+        elif preset and isinstance(value, str):
+            logger.warning("Preset %s: reference audio for %s not found, using none: %s", name, key, value)
+            params[key] = None
+
+    required_ref_param = ENGINE_REF_PARAM.get(engine)
+    if engine in REQUIRED_REF_ENGINES and required_ref_param and not params.get(required_ref_param):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Reference audio is required for {engine}. Save a voice sample and attach it to the preset.",
+        )
+
+    if CHATTERBOX_TURBO_REF_AUDIO:
+        if not os.path.isfile(CHATTERBOX_TURBO_REF_AUDIO):
+            raise HTTPException(
+                status_code=400,
+                detail=f"CHATTERBOX_TURBO_REF_AUDIO points to a missing file: {CHATTERBOX_TURBO_REF_AUDIO}. "
+                "Fix or clear it in the ENVIRONMENT file.",
+            )
+        params["chatterbox_turbo_ref_audio"] = handle_file(
+            CHATTERBOX_TURBO_REF_AUDIO
+        )
+    return {"engine": engine, "params": params}
+
+
+def plan_cache() -> dict:
+    """Compiled plans plus presets (by name and label) and voices (by id) for the current data version.
+
+    ``presets.json`` and ``voices.json`` are only read again when the data version
+    changes, so resolving a request's voice and preset does no file I/O.
+    """
+    global PRESET_PLANS
+    version = data_version()
+    cache = PRESET_PLANS
+    if cache["version"] == version:
+        return cache
+    presets: dict[str, dict] = {}
+    labels: dict[str, list] = {}
+    for preset in load_presets():
+        presets.setdefault(preset.get("name"), preset)
+        labels.setdefault(preset_label(preset).lower(), []).append(preset)
+    voices: dict[str, dict] = {}
+    for voice in load_voices():
+        voices.setdefault(voice.get("id"), voice)
+    cache = {"version": version, "plans": {}, "presets": presets, "labels": labels, "voices": voices, "voice_files": {}}
+    with PRESET_PLANS_LOCK:
+        if PRESET_PLANS["version"] != version:
+            PRESET_PLANS = cache
+        return PRESET_PLANS
+
+
+def preset_plan(preset: Optional[dict]) -> dict:
+    """Compiled plan for a preset (``None`` for the bare defaults), rebuilt after any data change."""
+    cache = plan_cache()
+    key = preset.get("name") if preset else None
+    plan = cache["plans"].get(key)
+    if plan is None:
+        plan = compile_plan(preset)
+        with PRESET_PLANS_LOCK:
+            cache["plans"][key] = plan
+    return plan
+
+
+def voice_sample_file(voice: dict) -> Any:
+    """The Gradio file reference for a saved voice sample, made once per data version."""
+    files = plan_cache()["voice_files"]
+    ref = files.get(voice["id"])
+    if ref is None:
+        ref = files[voice["id"]] = handle_file(str(resolve_voice_path(voice)))
+    return ref
+
+
+def warm_preset_plans() -> list[dict]:
+    """Compile every preset after a metadata reload; returns the ones that no longer validate."""
+    invalid = []
+    for preset in load_presets():
+        try:
+            preset_plan(preset)
+        except HTTPException as exc:
+            logger.warning("Preset %s is invalid: %s", preset.get("name"), exc.detail)
+            invalid.append({"name": preset.get("name"), "error": exc.detail})
+    return invalid
+
+
+def build_speech_params(req: OpenAITTSSpeechRequest) -> tuple[str, str, dict]:
+    text = (req.input or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Missing 'input' text")
+
+    # Presets and voices come from the plan cache, so this reads no files.
+    cache = plan_cache()
+    voice = (req.voice or "").strip()
+    preset = cache["presets"].get(voice) if voice else None
+    if not preset and voice:
+        preset = pick_labeled_preset(cache["labels"].get(voice.lower(), []), req.model or DEFAULT_TTS_ENGINE)
+    voice_sample = cache["voices"].get(req.voice) if req.voice and not preset else None
+    tts_engine = resolve_engine(req, preset)
+    if preset and req.model and preset.get("engine") != req.model:
+        raise HTTPException(status_code=400, detail="Preset engine does not match model")
+
+    out_fmt = resolve_output_format(req, preset)
+    params = dict(preset_plan(preset)["params"])
+    params.update({
+        "text_input": text,
+        "tts_engine": tts_engine,
+        "audio_format": out_fmt,
+    })
+    if preset:
+        return tts_engine, out_fmt, params
+
+    ref_param = ENGINE_REF_PARAM.get(tts_engine)
+    if voice_sample and ref_param:
+        params[ref_param] = voice_sample_file(voice_sample)
+        if CHATTERBOX_TURBO_REF_AUDIO:
+            # The configured Turbo reference still wins over a per-request sample.
+            params["chatterbox_turbo_ref_audio"] = preset_plan(None)["params"]["chatterbox_turbo_ref_audio"]
+
+    if req.voice and tts_engine in ENGINE_VOICE_PARAM:
+        voice_param = ENGINE_VOICE_PARAM[tts_engine]
+        if voice_param:
+            params[voice_param] = req.voice
+
+    if tts_engine in REQUIRED_REF_ENGINES and ref_param and not params.get(ref_param):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Reference audio is required for {tts_engine}. Save a voice sample and attach it to the preset.",
+        )
+    return tts_engine, out_fmt, params
+
+
+def call_gradio_tts(tts_engine: str, params: dict, cancelled=None, url: Optional[str] = None, report=None) -> str:
+    """Run the TTS call on one backend and return the output file's URL there (or a local path).
+
+    The call waits for a slot from the backend's admission gate first. ``cancelled``
+    is polled while waiting and while generating. Gradio drops a cancelled call that
+    is still queued, but cannot stop one that has started, so the slot is held until
+    that generation ends and the backend is never oversubscribed. ``report``
+    receives queue and progress events while the call runs (see ``gradio_status_event``).
+    """
+    url = url or GRADIO_URL
+    breaker = require_backend(url)
+    try:
+        with admission_gate(url).slot(tts_engine, cancelled, report) as waited:
+            if waited >= 1.0:
+                logger.info("Waited %.1fs for a %s slot on %s", waited, tts_engine, url)
+            client = gradio_client(url, download_files=False)
+            if AUTO_LOAD_ENGINE and ENGINE_LOAD_API.get(tts_engine):
+                if LOADED_ENGINES.get(url) != tts_engine:
+                    logger.info("Loading engine: %s on %s", tts_engine, url)
+                    if report is not None:
+                        report({"type": "speech.progress", "stage": "loading", "engine": tts_engine})
+                    client.predict(api_name=ENGINE_LOAD_API[tts_engine])
+                    LOADED_ENGINES[url] = tts_engine
+            job = client.submit(api_name=GRADIO_API_NAME, **params)
+            abandoned = False
+            while True:
+                try:
+                    result = job.result(timeout=ADMISSION_CHECK_INTERVAL)
+                    break
+                except FutureTimeoutError:
+                    if report is not None and not abandoned:
+                        event = gradio_status_event(job)
+                        if event:
+                            report(event)
+                    if abandoned or cancelled is None or not cancelled():
+                        continue
+                    if not gradio_job_started(job):
+                        job.cancel()
+                        raise RequestCancelled("Request cancelled before generating")
+                    abandoned = True
+            if abandoned:
+                breaker.record_success()
+                raise RequestCancelled("Request cancelled while generating")
+    except HTTPException:
+        raise
+    except Exception as exc:
+        safe_params = {}
+        for key, value in params.items():
+            if key in FILE_PARAM_NAMES or key.endswith("_ref_audio") or key.endswith("_emotion_audio"):
+                safe_params[key] = "file"
+            else:
+                safe_params[key] = value
+        logger.exception("Gradio call failed on %s for engine %s with params %s", url, tts_engine, safe_params)
+        if is_backend_failure(exc):
+            breaker.record_failure(str(exc))
+            # The backend may have restarted; rebuild the client on the next call.
+            with GRADIO_CLIENTS_LOCK:
+                GRADIO_CLIENTS.pop(url, None)
+        else:
+            breaker.record_success()
+        raise HTTPException(status_code=502, detail=f"Gradio call failed: {exc}")
+    breaker.record_success()
+
+    output = result[0] if isinstance(result, (list, tuple)) else result
+    source = backend_file_url(output, url)
+    if not source:
+        raise HTTPException(status_code=502, detail="No audio file returned")
+    return source
+
+
+def gradio_job_started(job: Any) -> bool:
+    try:
+        return job.status().code.name in ("PROCESSING", "PROGRESS", "ITERATING", "FINISHED")
+    except Exception:
+        return False
+
+
+def gradio_status_event(job: Any) -> Optional[dict]:
+    """Turn a Gradio job's latest status into a ``speech.queue`` or ``speech.progress`` event."""
+    try:
+        status = job.status()
+        code = status.code.name
+    except Exception:
+        return None
+    eta = round(status.eta, 1) if status.eta is not None else None
+    if code == "IN_QUEUE":
+        return {"type": "speech.queue", "stage": "backend", "position": status.rank, "queue_size": status.queue_size, "eta": eta}
+    if code not in ("PROCESSING", "PROGRESS", "ITERATING"):
+        return None
+    progress = None
+    for unit in status.progress_data or []:
+        if unit.progress is not None:
+            progress = unit.progress
+        elif unit.index is not None and unit.length:
+            progress = unit.index / unit.length
+    return {
+        "type": "speech.progress",
+        "stage": "generating",
+        "progress": round(progress, 3) if progress is not None else None,
+        "eta": eta,
+    }
+
+
+def backend_file_url(output: Any, url: Optional[str] = None) -> Optional[str]:
+    if isinstance(output, dict):
+        if output.get("url"):
+            return str(output["url"])
+        if output.get("path"):
+            return f"{url or GRADIO_URL}gradio_api/file={quote(str(output['path']), safe='/')}"
+        return None
+    if isinstance(output, str) and output and (re.match(r"^https?://", output) or os.path.exists(output)):
+        return output
+    return None
+
+
+BACKEND_HTTP = None
+BACKEND_HTTP_LOCK = threading.Lock()
+AUDIO_CHUNK_SIZE = 64 * 1024
+
+
+def backend_http() -> Any:
+    """Shared keep-alive HTTP client for fetching output files from Gradio backends."""
+    global BACKEND_HTTP
+    with BACKEND_HTTP_LOCK:
+        if BACKEND_HTTP is None:
+            httpx = lazy_import("httpx")
+            BACKEND_HTTP = httpx.Client(
+                timeout=httpx.Timeout(300.0, connect=5.0),
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=8),
+            )
+        return BACKEND_HTTP
+
+
+def open_backend_audio(source: str, url: str) -> tuple[Iterator[bytes], Optional[int]]:
+    """Open an output file of backend ``url`` for streaming, raising 502 before any bytes are sent."""
+    if not re.match(r"^https?://", source):
+        # Older gradio_client versions ignore download_files=False and return a local copy.
+        def iter_local() -> Iterator[bytes]:
+            try:
+                with open(source, "rb") as audio_file:
+                    while chunk := audio_file.read(AUDIO_CHUNK_SIZE):
+                        yield chunk
+            finally:
+                Path(source).unlink(missing_ok=True)
+
+        return iter_local(), os.path.getsize(source)
+
+    http = backend_http()
+    resp = None
+    try:
+        resp = http.send(http.build_request("GET", source), stream=True)
+        resp.raise_for_status()
+    except Exception as exc:
+        logger.warning("Failed to fetch Gradio output %s: %s", source, exc)
+        if resp is not None:
+            resp.close()
+        backend_breaker(url).record_failure(str(exc))
+        raise HTTPException(status_code=502, detail=f"Failed to fetch audio from Gradio: {exc}")
+
+    def iter_remote() -> Iterator[bytes]:
+        try:
+            yield from resp.iter_bytes(AUDIO_CHUNK_SIZE)
+        finally:
+            resp.close()
+
+    length = resp.headers.get("content-length")
+    return iter_remote(), int(length) if length and length.isdigit() else None
+
+
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 100
+
+
+class HedgeStats:
+    """Recent per-engine latency plus hedge counters.
+
+    A hedge fires once an attempt outlives ``HEDGE_PERCENTILE`` of recent latency
+    for its engine (never sooner than ``HEDGE_MIN_DELAY``), and at most
+    ``HEDGE_BUDGET`` of the last ``HEDGE_WINDOW`` calls may be hedged.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: dict[str, deque] = {}
+        self.hedge_calls: deque = deque()
+        self.counts = {"calls": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "over_budget": 0}
+
+    def observe(self, engine: str, latency: float) -> None:
+        with self.lock:
+            self.latencies.setdefault(engine, deque(maxlen=200)).append(latency)
+
+    def delay(self, engine: str) -> Optional[float]:
+        with self.lock:
+            return self.delay_locked(engine)
+
+    def delay_locked(self, engine: str) -> Optional[float]:
+        samples = sorted(self.latencies.get(engine, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(HEDGE_PERCENTILE / 100 * len(samples)))
+        return max(HEDGE_MIN_DELAY, samples[index])
+
+    def record_call(self) -> None:
+        with self.lock:
+            self.counts["calls"] += 1
+
+    def try_hedge(self) -> bool:
+        with self.lock:
+            # Hedges among the last HEDGE_WINDOW calls count against the budget.
+            while self.hedge_calls and self.hedge_calls[0] <= self.counts["calls"] - HEDGE_WINDOW:
+                self.hedge_calls.popleft()
+            if len(self.hedge_calls) + 1 > HEDGE_BUDGET * HEDGE_WINDOW:
+                self.counts["over_budget"] += 1
+                return False
+            self.hedge_calls.append(self.counts["calls"])
+            self.counts["hedged"] += 1
+            return True
+
+    def record_winner(self, hedge_won: bool) -> None:
+        with self.lock:
+            self.counts["hedge_wins" if hedge_won else "primary_wins"] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "percentile": HEDGE_PERCENTILE,
+                "min_delay": HEDGE_MIN_DELAY,
+                "budget": HEDGE_BUDGET,
+                **self.counts,
+                "delay_s": {engine: self.delay_locked(engine) for engine in self.latencies},
+            }
+
+
+HEDGES = HedgeStats()
+HEDGE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+HEDGE_EXECUTOR_LOCK = threading.Lock()
+
+
+def hedge_executor() -> ThreadPoolExecutor:
+    global HEDGE_EXECUTOR
+    with HEDGE_EXECUTOR_LOCK:
+        if HEDGE_EXECUTOR is None:
+            HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="tts-hedge")
+        return HEDGE_EXECUTOR
+
+
+def ranked_backends(engine: str) -> list[str]:
+    """Backends to try, best first: healthy, least busy, engine already loaded."""
+    urls = backend_urls()
+
+    def rank(item: tuple[int, str]) -> tuple:
+        index, url = item
+        gate = admission_gate(url)
+        return (
+            backend_breaker(url).state != "closed",
+            gate.in_flight + len(gate.waiters),
+            LOADED_ENGINES.get(url) != engine,
+            index,
+        )
+
+    return [url for _, url in sorted(enumerate(urls), key=rank)]
+
+
+def idle_backend(engine: str, exclude: str) -> Optional[str]:
+    for url in ranked_backends(engine):
+        gate = admission_gate(url)
+        if url != exclude and backend_breaker(url).state == "closed" and not gate.waiters and gate.has_room(engine):
+            return url
+    return None
+
+
+def dispatch_tts(tts_engine: str, params: dict, cancelled=None, report=None) -> tuple[str, str]:
+    """Send a TTS call to the best backend, hedging to an idle replica when it runs long.
+
+    Returns the output file and the URL of the backend that produced it.
+
+    Without replicas or with hedging off this is a plain ``call_gradio_tts``. The
+    first attempt to succeed wins; the other is cancelled. Synthesis is never
+    retried after a failure, so a failed attempt only loses to a running one.
+    Only the first attempt feeds ``report``.
+    """
+    urls = ranked_backends(tts_engine)
+    delay = HEDGES.delay(tts_engine) if HEDGE_PERCENTILE > 0 and len(urls) > 1 else None
+    started = time.monotonic()
+    HEDGES.record_call()
+    if delay is None:
+        source = call_gradio_tts(tts_engine, params, cancelled, urls[0], report)
+        HEDGES.observe(tts_engine, time.monotonic() - started)
+        return source, urls[0]
+
+    attempts = []
+
+    def launch(url: str, report=None) -> None:
+        stop = threading.Event()
+        future = hedge_executor().submit(serving_request(call_gradio_tts), tts_engine, params, stop.is_set, url, report)
+        attempts.append((future, stop, url))
+
+    launch(urls[0], report)
+    pending = {attempts[0][0]}
+    hedged = False
+    error: Optional[Exception] = None
+    try:
+        while pending:
+            timeout = ADMISSION_CHECK_INTERVAL
+            if not hedged:
+                timeout = max(0.0, min(timeout, started + delay - time.monotonic()))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = next(attempt_url for attempt, _, attempt_url in attempts if attempt is future)
+                try:
+                    source = future.result()
+                except Exception as exc:
+                    error = error or exc
+                    continue
+                if hedged:
+                    HEDGES.record_winner(future is not attempts[0][0])
+                # Recorded whoever wins: if the hedge did, the primary took at least
+                # this long. Dropping those slow primaries would pull the percentile
+                # down until every call hedged.
+                HEDGES.observe(tts_engine, time.monotonic() - started)
+                return source, url
+            if cancelled is not None and cancelled():
+                raise RequestCancelled()
+            if not hedged and pending and time.monotonic() - started >= delay:
+                hedged = True
+                url = idle_backend(tts_engine, exclude=urls[0])
+                if url and HEDGES.try_hedge():
+                    logger.info("Hedging %s request to %s after %.1fs", tts_engine, url, delay)
+                    launch(url)
+                    pending.add(attempts[-1][0])
+        raise error
+    finally:
+        for _, stop, _ in attempts:
+            stop.set()
+
+
+def synthesize_speech_stream(req: OpenAITTSSpeechRequest, cancelled=None) -> tuple[Iterator[bytes], str, Optional[int]]:
+    tts_engine, out_fmt, params = build_speech_params(req)
+    chunks, length = render_audio(tts_engine, out_fmt, params, cancelled)
+    return chunks, out_fmt, length
+
+
+def synthesize_speech(req: OpenAITTSSpeechRequest, cancelled=None) -> tuple[bytes, str]:
+    chunks, out_fmt, _ = synthesize_speech_stream(req, cancelled)
+    return b"".join(chunks), out_fmt
+
+
+RESULT_CACHE_MAX_CHARS = 1000
+RESULT_CACHE_LOCK = threading.Lock()
+RESULT_CACHE_STATS = {"hits": 0, "misses": 0, "stored": 0}
+
+
+def result_cache_path(tts_engine: str, out_fmt: str, params: dict) -> Optional[Path]:
+    """Where the audio for these compiled params is cached, or None when it is not cacheable.
+
+    Voice files are keyed by path plus size and mtime, so replacing a sample
+    misses the old entries instead of serving the previous voice.
+    """
+    if RESULT_CACHE_MB <= 0 or len(str(params.get("text_input") or "")) > RESULT_CACHE_MAX_CHARS:
+        return None
+
+    def stable(value: Any) -> Any:
+        if isinstance(value, dict) and value.get("path"):
+            return [str(value["path"]), file_signature(Path(str(value["path"])))]
+        return value
+
+    payload = json.dumps(
+        {"api_name": GRADIO_API_NAME, "engine": tts_engine, "params": {key: stable(value) for key, value in params.items()}},
+        sort_keys=True,
+        default=str,
+    )
+    return RESULT_CACHE_DIR / f"{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}.{out_fmt}"
+
+
+def open_cached_result(path: Path) -> Optional[tuple[Iterator[bytes], Optional[int]]]:
+    try:
+        # Opened here so a prune between lookup and streaming cannot break the response.
+        audio_file = path.open("rb")
+        size = os.fstat(audio_file.fileno()).st_size
+    except OSError:
+        with RESULT_CACHE_LOCK:
+            RESULT_CACHE_STATS["misses"] += 1
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    with RESULT_CACHE_LOCK:
+        RESULT_CACHE_STATS["hits"] += 1
+
+    def iter_cached() -> Iterator[bytes]:
+        with audio_file:
+            while chunk := audio_file.read(AUDIO_CHUNK_SIZE):
+                yield chunk
+
+    return iter_cached(), size
+
+
+def cache_result_chunks(path: Path, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Pass audio through while writing it to the cache; only a complete file is kept."""
+    tmp_path = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    stored = False
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("wb") as cached:
+            for chunk in chunks:
+                cached.write(chunk)
+                yield chunk
+        try:
+            tmp_path.replace(path)
+            stored = True
+        except PermissionError:
+            # Windows refuses while another request reads the cached copy; keep that one.
+            pass
+    finally:
+        if not stored:
+            tmp_path.unlink(missing_ok=True)
+    if stored:
+        with RESULT_CACHE_LOCK:
+            RESULT_CACHE_STATS["stored"] += 1
+        prune_result_cache()
+
+
+def result_cache_files() -> list[tuple[float, int, Path]]:
+    entries = []
+    for path in RESULT_CACHE_DIR.glob("*"):
+        if path.suffix == ".tmp":
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def prune_result_cache() -> None:
+    """Drop least recently used results until the cache fits in RESULT_CACHE_MB."""
+    limit = RESULT_CACHE_MB * 1024 * 1024
+    with RESULT_CACHE_LOCK:
+        entries = sorted(result_cache_files())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except PermissionError:
+                continue  # open for reading on Windows; the next prune retries it
+            total -= size
+
+
+def render_audio(
+    tts_engine: str, out_fmt: str, params: dict, cancelled=None, report=None
+) -> tuple[Iterator[bytes], Optional[int]]:
+    """Audio for compiled params, from the result cache when possible, else from Gradio (filling the cache)."""
+    path = result_cache_path(tts_engine, out_fmt, params)
+    if path is not None:
+        cached = open_cached_result(path)
+        if cached is not None:
+            return cached
+    source, url = dispatch_tts(tts_engine, params, cancelled, report)
+    chunks, length = open_backend_audio(source, url)
+    if path is not None:
+        chunks = cache_result_chunks(path, chunks)
+    return chunks, length
+
+
+REQUEST_HISTORY: dict[str, dict] = {}
+REQUEST_HISTORY_STATE = {"dirty": False}
+REQUEST_HISTORY_LOCK = threading.Lock()
+REQUEST_HISTORY_FIELDS = ("model", "voice", "response_format", "speed", "input")
+REQUEST_HISTORY_FLUSH_INTERVAL = 60.0
+
+
+def record_request_history(req: OpenAITTSSpeechRequest) -> None:
+    """Count a short speech request so the cache warmer can replay the most frequent ones."""
+    if REQUEST_HISTORY_SIZE <= 0 or len(req.input or "") > RESULT_CACHE_MAX_CHARS:
+        return
+    request = {key: value for key, value in req.model_dump(include=set(REQUEST_HISTORY_FIELDS)).items() if value is not None}
+    key = json.dumps(request, sort_keys=True)
+    with REQUEST_HISTORY_LOCK:
+        entry = REQUEST_HISTORY.setdefault(key, {"request": request, "count": 0})
+        entry["count"] += 1
+        entry["last_at"] = now_iso()
+        if len(REQUEST_HISTORY) > REQUEST_HISTORY_SIZE:
+            coldest = min(REQUEST_HISTORY, key=lambda k: (REQUEST_HISTORY[k]["count"], REQUEST_HISTORY[k]["last_at"]))
+            del REQUEST_HISTORY[coldest]
+        REQUEST_HISTORY_STATE["dirty"] = True
+
+
+def top_requests(limit: int) -> list[dict]:
+    with REQUEST_HISTORY_LOCK:
+        entries = sorted(REQUEST_HISTORY.values(), key=lambda entry: (-entry["count"], entry["last_at"]))
+    return [dict(entry["request"]) for entry in entries[:limit]]
+
+
+def load_request_history() -> None:
+    entries = load_json(REQUEST_HISTORY_FILE, [])
+    with REQUEST_HISTORY_LOCK:
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and isinstance(entry.get("request"), dict) and entry["request"].get("input"):
+                REQUEST_HISTORY[json.dumps(entry["request"], sort_keys=True)] = entry
+
+
+def flush_request_history() -> None:
+    with REQUEST_HISTORY_LOCK:
+        if not REQUEST_HISTORY_STATE["dirty"]:
+            return
+        entries = list(REQUEST_HISTORY.values())
+        REQUEST_HISTORY_STATE["dirty"] = False
+    save_json(REQUEST_HISTORY_FILE, entries)
+
+
+def request_history_flusher() -> None:
+    while True:
+        time.sleep(REQUEST_HISTORY_FLUSH_INTERVAL)
+        try:
+            flush_request_history()
+        except Exception:
+            logger.exception("Saving request history failed")
+
+
+def gradio_temp_dir() -> Optional[Path]:
+    """The proxy's own ``GRADIO_TEMP_DIR``, or None when it is not set.
+
+    Without it gradio_client uses ``<tmp>/gradio``, which a Gradio backend on the
+    same machine shares and may still be serving files from, so it is left alone.
+    """
+    value = os.environ.get("GRADIO_TEMP_DIR")
+    return Path(value).resolve() if value else None
+
+
+def prune_gradio_temp(root: Path) -> int:
+    """Delete files older than GRADIO_TEMP_MAX_AGE, then oldest first down to GRADIO_TEMP_MAX_MB."""
+    if not root.is_dir():
+        return 0
+    now = time.time()
+    files = []
+    for path in root.rglob("*"):
+        try:
+            if path.is_file():
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            continue
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    limit = GRADIO_TEMP_MAX_MB * 1024 * 1024
+    removed = 0
+    for mtime, size, path in files:
+        age = now - mtime
+        # Never touch files from the last minute; a download may still be writing them.
+        if age < 60 or (age < GRADIO_TEMP_MAX_AGE and total <= limit):
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    for directory in sorted((p for p in root.rglob("*") if p.is_dir()), key=lambda p: len(p.parts), reverse=True):
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+    return removed
+
+
+def gradio_temp_janitor() -> None:
+    root = gradio_temp_dir()
+    if root is None:
+        logger.info("GRADIO_TEMP_DIR is not set; leftover Gradio temp files are not cleaned up")
+        return
+    while True:
+        try:
+            removed = prune_gradio_temp(root)
+            if removed:
+                logger.info("Removed %d stale files from %s", removed, root)
+        except Exception:
+            logger.exception("Gradio temp cleanup failed")
+        time.sleep(600)
+
+
+def audio_media_type(out_fmt: str) -> str:
+    return "audio/mpeg" if out_fmt == "mp3" else "audio/wav"
+
+
+REALTIME_CLAUSE_MIN_CHARS = 60
+REALTIME_MAX_SEGMENT_CHARS = 400
+REALTIME_SETTINGS = ("model", "voice", "response_format", "speed")
+SENTENCE_BOUNDARY = re.compile(r"[.!?\u2026]+[\"')\]\u201d\u2019]*\s+|\n\s*")
+CLAUSE_BOUNDARY = re.compile(r"[,;:\u2014]\s+")
+
+
+def realtime_settings_error(settings: dict) -> Optional[str]:
+    """Check session settings the way a speech request would; returns the problem or None."""
+    try:
+        OpenAITTSSpeechRequest(input="-", **settings)
+    except ValidationError as exc:
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors())
+    return None
+
+
+async def receive_realtime_message(websocket: WebSocket) -> Any:
+    """Next client message parsed as JSON; raises ``ValueError`` for binary or malformed frames."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("text") is None:
+        raise ValueError("binary frame")
+    return json.loads(message["text"])
+
+
+def split_ready_segments(buffer: str) -> tuple[list[str], str]:
+    """Cut complete sentences (and long clauses) off the front of a streaming text buffer.
+
+    A boundary only counts once the whitespace after it has arrived, so "3." of
+    "3.14" is never cut. Returns the ready segments and the remaining buffer.
+    """
+    segments = []
+    while buffer:
+        match = SENTENCE_BOUNDARY.search(buffer)
+        cut = match.end() if match else None
+        if cut is None and len(buffer) >= REALTIME_CLAUSE_MIN_CHARS:
+            clauses = [m for m in CLAUSE_BOUNDARY.finditer(buffer) if m.end() >= REALTIME_CLAUSE_MIN_CHARS]
+            if clauses:
+                cut = clauses[0].end()
+        if cut is None and len(buffer) > REALTIME_MAX_SEGMENT_CHARS:
+            space = buffer.rfind(" ", 0, REALTIME_MAX_SEGMENT_CHARS)
+            cut = space + 1 if space > 0 else REALTIME_MAX_SEGMENT_CHARS
+        if cut is None:
+            break
+        segment, buffer = buffer[:cut].strip(), buffer[cut:]
+        if segment:
+            segments.append(segment)
+    return segments, buffer
+
+
+async def realtime_worker(websocket: WebSocket, queue: asyncio.Queue, session: dict, token: Optional[str]) -> None:
+    """Synthesize queued segments one at a time and send them back in sequence order."""
+    while True:
+        kind, generation, seq, text = await queue.get()
+        if generation != session["generation"]:
+            continue
+        if kind == "flush":
+            await websocket.send_json({"type": "flushed", "seq": seq})
+            continue
+        try:
+            await run_control(require_api_key, websocket, chars=len(text), token=token)
+            req = OpenAITTSSpeechRequest(input=text, **session["settings"])
+            audio_bytes, out_fmt = await run_synthesis(
+                synthesize_speech, req, lambda: generation != session["generation"]
+            )
+        except HTTPException as exc:
+            if generation == session["generation"]:
+                await websocket.send_json({"type": "error", "seq": seq, "status": exc.status_code, "detail": exc.detail})
+            continue
+        except Exception as exc:
+            logger.exception("Realtime segment %d failed", seq)
+            if generation == session["generation"]:
+                await websocket.send_json({"type": "error", "seq": seq, "status": 500, "detail": str(exc)})
+            continue
+        if generation != session["generation"]:
+            continue
+        await websocket.send_json({"type": "audio", "seq": seq, "format": out_fmt, "bytes": len(audio_bytes), "text": text})
+        await websocket.send_bytes(audio_bytes)
+
+
+FANOUT_SILENCE_LEVEL = 100
+FANOUT_MAX_GAIN = 2.0
+# Sample operations run on slices of this size: each slice is one fast C-level
+# call, and other threads get the GIL between slices.
+AUDIO_SCAN_CHUNK = 4096
+AUDIO_GAIN_CHUNK = 1 << 16
+AUDIO_RMS_MAX_SAMPLES = 1 << 18
+
+
+def split_long_text(text: str, max_chars: int) -> list[tuple[str, bool]]:
+    """Split text into segments of whole sentences, at most ``max_chars`` where possible.
+
+    Segments never span paragraphs. Returns ``(segment, ends_paragraph)`` pairs.
+    """
+    segments = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        sentences, rest = split_ready_segments(" ".join(paragraph.split()) + "\n")
+        if rest.strip():
+            sentences.append(rest.strip())
+        current = ""
+        for sentence in sentences:
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                segments.append((current, False))
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+        if current:
+            segments.append((current, True))
+    return segments
+
+
+def plan_fanout(req: OpenAITTSSpeechRequest, fanout: Optional[bool]) -> Optional[tuple[str, str, dict, list]]:
+    """Decide whether a job renders as parallel segments; returns the plan or None.
+
+    ``fanout`` forces it on or off; otherwise long inputs fan out when there is more
+    than one backend and the requested format can be produced.
+    """
+    if fanout is False:
+        return None
+    text = (req.input or "").strip()
+    if fanout is None and (not FANOUT_MIN_CHARS or len(text) < FANOUT_MIN_CHARS or len(backend_urls()) < 2):
+        return None
+    tts_engine, out_fmt, params = build_speech_params(req)
+    if out_fmt == "mp3" and not shutil.which("ffmpeg"):
+        if fanout is None:
+            return None
+        out_fmt = "wav"
+    segments = split_long_text(text, FANOUT_SEGMENT_CHARS)
+    if len(segments) < 2:
+        return None
+    return tts_engine, out_fmt, dict(params, audio_format="wav"), segments
+
+
+def fanout_slots(tts_engine: str) -> list[str]:
+    """One entry per generation slot on each backend that is not failing fast."""
+    per_backend = min(BACKEND_CONCURRENCY, ENGINE_LIMITS.get(tts_engine) or BACKEND_CONCURRENCY)
+    urls = [url for url in ranked_backends(tts_engine) if backend_breaker(url).state != "open"]
+    return [url for url in urls for _ in range(per_backend)] or [GRADIO_URL]
+
+
+def synthesize_fanout(plan: tuple[str, str, dict, list], cancelled=None, progress=None) -> tuple[bytes, str]:
+    """Render segments concurrently across backends and join them in order.
+
+    Each slot takes the next unrendered segment, so faster replicas render more of
+    them. A failed segment fails the whole render.
+    """
+    tts_engine, out_fmt, params, segments = plan
+    pending = deque(range(len(segments)))
+    results: list[Optional[bytes]] = [None] * len(segments)
+    lock = threading.Lock()
+    failed = threading.Event()
+
+    def stopped() -> bool:
+        return failed.is_set() or (cancelled is not None and cancelled())
+
+    def work(url: str) -> None:
+        while not failed.is_set():
+            with lock:
+                if not pending:
+                    return
+                index = pending.popleft()
+            try:
+                source = call_gradio_tts(tts_engine, dict(params, text_input=segments[index][0]), stopped, url)
+                chunks, _ = open_backend_audio(source, url)
+                audio = b"".join(chunks)
+            except Exception:
+                failed.set()
+                raise
+            with lock:
+                results[index] = audio
+                done = sum(result is not None for result in results)
+            if progress is not None:
+                progress(done, len(segments))
+
+    slots = fanout_slots(tts_engine)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(slots), thread_name_prefix="tts-fanout") as executor:
+        futures = [executor.submit(serving_request(work), url) for url in slots]
+    for future in futures:
+        if future.exception() is not None and not isinstance(future.exception(), RequestCancelled):
+            raise future.exception()
+    if (cancelled is not None and cancelled()) or any(result is None for result in results):
+        raise RequestCancelled()
+    logger.info(
+        "Rendered %d segments on %d slots in %.1fs",
+        len(segments), len(slots), time.monotonic() - started,
+    )
+    audio = join_wav_segments(results, [ends_paragraph for _, ends_paragraph in segments])
+    if out_fmt == "mp3":
+        audio = encode_mp3(audio)
+    return audio, out_fmt
+
+
+def read_pcm16(data: bytes) -> tuple[tuple[int, int], array]:
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2:
+                raise HTTPException(status_code=502, detail="Backend returned WAV that is not 16-bit PCM")
+            layout = (wav.getnchannels(), wav.getframerate())
+            samples = array("h", wav.readframes(wav.getnframes()))
+    except (wave.Error, EOFError) as exc:
+        raise HTTPException(status_code=502, detail=f"Backend returned unreadable WAV: {exc}")
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return layout, samples
+
+
+def is_loud(chunk: array) -> bool:
+    return bool(chunk) and (max(chunk) > FANOUT_SILENCE_LEVEL or min(chunk) < -FANOUT_SILENCE_LEVEL)
+
+
+def trim_silence(samples: array, channels: int) -> array:
+    step = AUDIO_SCAN_CHUNK
+    starts = range(0, len(samples), step)
+    first = next((i for i in starts if is_loud(samples[i:i + step])), None)
+    if first is None:
+        return array("h")
+    last = next(i for i in reversed(starts) if is_loud(samples[i:i + step]))
+    start = first + next(i for i, s in enumerate(samples[first:first + step]) if abs(s) > FANOUT_SILENCE_LEVEL)
+    tail = samples[last:last + step]
+    end = last + len(tail) - next(i for i, s in enumerate(reversed(tail)) if abs(s) > FANOUT_SILENCE_LEVEL)
+    start -= start % channels
+    end = min(len(samples), end + -end % channels)
+    return samples[start:end]
+
+
+def rms(samples: array) -> float:
+    """Root mean square level, estimated from at most ``AUDIO_RMS_MAX_SAMPLES`` evenly spaced samples."""
+    if not samples:
+        return 0.0
+    picked = samples[::max(1, len(samples) // AUDIO_RMS_MAX_SAMPLES)]
+    total = 0
+    for i in range(0, len(picked), AUDIO_GAIN_CHUNK):
+        chunk = picked[i:i + AUDIO_GAIN_CHUNK]
+        total += sum(map(operator.mul, chunk, chunk))
+    return math.sqrt(total / len(picked))
+
+
+def peak(samples: array) -> int:
+    loudest = 0
+    for i in range(0, len(samples), AUDIO_GAIN_CHUNK):
+        chunk = samples[i:i + AUDIO_GAIN_CHUNK]
+        loudest = max(loudest, max(chunk), -min(chunk))
+    return loudest
+
+
+def apply_gain(samples: array, gain: float) -> array:
+    """Scale 16-bit samples through a lookup table indexed by their unsigned bit pattern."""
+    table = array("h", (
+        max(-32768, min(32767, int((u - 65536 if u > 32767 else u) * gain))) for u in range(65536)
+    ))
+    unsigned = array("H", samples.tobytes())
+    scaled = array("h")
+    for i in range(0, len(unsigned), AUDIO_GAIN_CHUNK):
+        scaled.extend(map(table.__getitem__, unsigned[i:i + AUDIO_GAIN_CHUNK]))
+    return scaled
+
+
+def join_wav_segments(parts: list[bytes], paragraph_ends: list[bool], timings: Optional[list] = None) -> bytes:
+    """Join WAV clips with trimmed edges, a common loudness and fixed pauses between them.
+
+    Each clip is scaled towards the median RMS of all clips (at most
+    ``FANOUT_MAX_GAIN`` either way, never past full scale), then separated by
+    ``FANOUT_JOIN_MS`` of silence, doubled after a paragraph. If ``timings`` is
+    given, each clip's ``(start, end)`` in seconds is appended to it.
+    """
+    layout = None
+    clips = []
+    for data in parts:
+        clip_layout, samples = read_pcm16(data)
+        if layout is not None and clip_layout != layout:
+            raise HTTPException(status_code=502, detail="Backends returned segments with different audio formats")
+        layout = clip_layout
+        clips.append(trim_silence(samples, clip_layout[0]))
+    channels, rate = layout
+    levels = [rms(clip) for clip in clips]
+    target = statistics.median([level for level in levels if level] or [0.0])
+    pause = array("h", bytes(2 * channels * int(rate * FANOUT_JOIN_MS / 1000)))
+    joined = array("h")
+    for index, (clip, level) in enumerate(zip(clips, levels)):
+        if level and target:
+            gain = max(1 / FANOUT_MAX_GAIN, min(target / level, FANOUT_MAX_GAIN))
+            gain = min(gain, 32767 / peak(clip))
+            if abs(gain - 1.0) > 0.05:
+                clip = apply_gain(clip, gain)
+        if timings is not None:
+            start = len(joined) / channels / rate
+            timings.append((round(start, 3), round(start + len(clip) / channels / rate, 3)))
+        joined.extend(clip)
+        if index < len(clips) - 1:
+            joined.extend(pause)
+            if paragraph_ends[index]:
+                joined.extend(pause)
+    if sys.byteorder == "big":
+        joined.byteswap()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(joined.tobytes())
+    return buffer.getvalue()
+
+
+def encode_mp3(wav_bytes: bytes) -> bytes:
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0", "-f", "mp3", "pipe:1"],
+        input=wav_bytes,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise HTTPException(status_code=500, detail=f"ffmpeg failed: {result.stderr.decode(errors='replace')[-200:]}")
+    return result.stdout
+
+
+JOB_DONE_STATUSES = ("succeeded", "failed", "cancelled")
+JOB_JANITOR_INTERVAL = 300.0
+JOBS: dict[str, dict] = {}
+# JOBS_LOCK only guards the in-memory records, so /health can take it on the event
+# loop; job files are written and deleted under JOB_FILES_LOCK, outside JOBS_LOCK.
+JOBS_LOCK = threading.Lock()
+JOB_FILES_LOCK = threading.Lock()
+JOB_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+class SpeechJobRequest(OpenAITTSSpeechRequest):
+    webhook_url: Optional[str] = None
+    fanout: Optional[bool] = None
+
+
+def job_meta_path(job_id: str) -> Path:
+    return JOB_DIR / f"{job_id}.json"
+
+
+def job_result_path(job: dict) -> Optional[Path]:
+    filename = job.get("result_file")
+    return JOB_DIR / filename if filename else None
+
+
+def save_job(job: dict) -> None:
+    """Write the job's current state; call without holding ``JOBS_LOCK``.
+
+    The state is copied at write time, so concurrent saves of the same job always
+    end with the latest one, and a job removed in the meantime is not written back.
+    """
+    with JOB_FILES_LOCK:
+        with JOBS_LOCK:
+            if JOBS.get(job["id"]) is not job:
+                return
+            data = dict(job)
+        save_json(job_meta_path(job["id"]), data)
+
+
+def public_job(job: dict) -> dict:
+    data = {
+        "id": job["id"],
+        "object": "speech.job",
+        "status": job["status"],
+        "progress": job.get("progress", 0.0),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "expires_at": job.get("expires_at"),
+        "response_format": job.get("response_format"),
+        "bytes": job.get("bytes"),
+        "error": job.get("error"),
+    }
+    if job.get("segments"):
+        data["segments"] = job["segments"]
+    if job["status"] == "running" and job.get("cancel_requested"):
+        data["cancel_requested"] = True
+    if job["status"] == "succeeded":
+        data["content_url"] = f"/v1/audio/speech/jobs/{job['id']}/content"
+    return data
+
+
+def job_executor() -> ThreadPoolExecutor:
+    global JOB_EXECUTOR
+    with JOBS_LOCK:
+        if JOB_EXECUTOR is None:
+            JOB_EXECUTOR = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="tts-job")
+        return JOB_EXECUTOR
+
+
+def enqueue_job(job_id: str) -> None:
+    job_executor().submit(serving_request(run_job), job_id)
+
+
+def update_job(job: dict, **changes: Any) -> None:
+    with JOBS_LOCK:
+        job.update(changes)
+    save_job(job)
+
+
+def run_job(job_id: str) -> None:
+    with JOBS_LOCK:
+        job = JOBS.get(job_id)
+        if not job or job["status"] != "queued":
+            return
+    update_job(job, status="running", started_at=now_iso(), progress=0.0)
+
+    def report(event: dict) -> None:
+        # Gradio progress, for engines that report it; held below 1.0 until the file is saved.
+        progress = event.get("progress") if event.get("type") == "speech.progress" else None
+        if progress is not None and min(progress, 0.99) > job.get("progress", 0.0):
+            update_job(job, progress=round(min(progress, 0.99), 3))
+
+    try:
+        req = OpenAITTSSpeechRequest(**job["request"])
+        cancelled = lambda: bool(job.get("cancel_requested"))
+        plan = plan_fanout(req, job.get("fanout"))
+        if plan:
+            update_job(job, segments=len(plan[3]))
+            audio, out_fmt = synthesize_fanout(
+                plan, cancelled, lambda done, total: update_job(job, progress=round(done / total, 3))
+            )
+            chunks = [audio]
+        else:
+            tts_engine, out_fmt, params = build_speech_params(req)
+            chunks, _ = render_audio(tts_engine, out_fmt, params, cancelled, report)
+        result_file = f"{job_id}.{out_fmt}"
+        tmp_path = JOB_DIR / f"{result_file}.tmp"
+        size = 0
+        with tmp_path.open("wb") as result:
+            for chunk in chunks:
+                result.write(chunk)
+                size += len(chunk)
+        tmp_path.replace(JOB_DIR / result_file)
+        finished = datetime.now(timezone.utc)
+        update_job(
+            job,
+            status="succeeded",
+            progress=1.0,
+            result_file=result_file,
+            response_format=out_fmt,
+            bytes=size,
+            finished_at=finished.isoformat(),
+            finished_ts=finished.timestamp(),
+            expires_at=datetime.fromtimestamp(finished.timestamp() + JOB_TTL_SECONDS, timezone.utc).isoformat(),
+        )
+    except RequestCancelled:
+        update_job(job, status="cancelled", finished_at=now_iso(), finished_ts=time.time())
+    except HTTPException as exc:
+        update_job(job, status="failed", error=str(exc.detail), finished_at=now_iso(), finished_ts=time.time())
+    except Exception as exc:
+        logger.exception("Speech job %s failed", job_id)
+        update_job(job, status="failed", error=str(exc), finished_at=now_iso(), finished_ts=time.time())
+    notify_job_webhook(job)
+    prune_jobs()
+
+
+def webhook_url_error(url: str) -> Optional[str]:
+    """Why the proxy refuses to call ``url`` back, or None when it may.
+
+    Hosts listed in ``JOB_WEBHOOK_ALLOWED_HOSTS`` (``*`` for any) are always allowed.
+    Any other host must resolve only to public addresses, so API keys cannot point
+    the proxy at loopback, LAN or cloud metadata services.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return "webhook_url must be an http(s) URL"
+    allowed = {item.strip().lower() for item in JOB_WEBHOOK_ALLOWED_HOSTS.split(",") if item.strip()}
+    if "*" in allowed or parts.hostname.lower() in allowed:
+        return None
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    except (OSError, UnicodeError):
+        return f"webhook_url host does not resolve: {parts.hostname}"
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if not address.is_global:
+            return f"webhook_url host {parts.hostname} is not a public address; add it to JOB_WEBHOOK_ALLOWED_HOSTS"
+    return None
+
+
+def notify_job_webhook(job: dict) -> None:
+    url = job.get("webhook_url")
+    if not url:
+        return
+    # Checked again here: DNS may have changed since the job was created.
+    problem = webhook_url_error(url)
+    if problem:
+        logger.warning("Webhook for job %s skipped: %s", job["id"], problem)
+        return
+    try:
+        resp = lazy_import("httpx").post(url, json=public_job(job), timeout=10.0)
+        resp.raise_for_status()
+    except Exception as exc:
+        logger.warning("Webhook for job %s failed: %s", job["id"], exc)
+
+
+def delete_job_files(job: dict) -> None:
+    result_path = job_result_path(job)
+    with JOB_FILES_LOCK:
+        for path in (result_path, job_meta_path(job["id"])):
+            if path is not None and path.exists():
+                path.unlink()
+
+
+def prune_jobs() -> None:
+    """Drop finished jobs past their TTL, then oldest results until under JOB_MAX_DISK_MB."""
+    now = time.time()
+    removed = []
+    with JOBS_LOCK:
+        finished = [job for job in JOBS.values() if job["status"] in JOB_DONE_STATUSES]
+        for job in finished:
+            if now - job.get("finished_ts", now) > JOB_TTL_SECONDS:
+                removed.append(JOBS.pop(job["id"]))
+        stored = sorted(
+            (job for job in JOBS.values() if job["status"] == "succeeded" and job.get("bytes")),
+            key=lambda job: job.get("finished_ts", 0),
+        )
+        total = sum(job["bytes"] for job in stored)
+        limit = JOB_MAX_DISK_MB * 1024 * 1024
+        for job in stored:
+            if total <= limit:
+                break
+            total -= job["bytes"]
+            removed.append(JOBS.pop(job["id"]))
+    for job in removed:
+        delete_job_files(job)
+
+
+def job_janitor() -> None:
+    while True:
+        time.sleep(JOB_JANITOR_INTERVAL)
+        try:
+            prune_jobs()
+        except Exception:
+            logger.exception("Job cleanup failed")
+
+
+WARM_IDLE_POLL = 1.0
+WARM_RUN = None
+WARM_LAST = None
+WARM_LOCK = threading.Lock()
+
+
+def backend_idle(tts_engine: str) -> bool:
+    gate = admission_gate(ranked_backends(tts_engine)[0])
+    with gate.cond:
+        return gate.in_flight == 0 and not gate.waiters and gate.has_room(tts_engine)
+
+
+class CacheWarmer:
+    """Renders a list of speech requests into the result cache, one at a time.
+
+    Each render waits until the best backend for its engine is idle, then takes
+    a slot through the normal admission gate, so warming only fills gaps between
+    real requests and never exceeds the concurrency limits.
+    """
+
+    def __init__(self, items: list[dict]) -> None:
+        self.items = items
+        self.status = "running"
+        self.counts = {"done": 0, "cached": 0, "rendered": 0, "failed": 0}
+        self.errors: deque = deque(maxlen=10)
+        self.started_at = now_iso()
+        self.finished_at: Optional[str] = None
+        self.stopped = threading.Event()
+
+    def start(self) -> None:
+        threading.Thread(target=self.run, name="tts-cache-warm", daemon=True).start()
+
+    def wait_for_idle(self, tts_engine: str) -> bool:
+        while not backend_idle(tts_engine):
+            if self.stopped.wait(WARM_IDLE_POLL):
+                return False
+        return not self.stopped.is_set()
+
+    def warm(self, item: dict) -> None:
+        tts_engine, out_fmt, params = build_speech_params(OpenAITTSSpeechRequest(**item))
+        path = result_cache_path(tts_engine, out_fmt, params)
+        if path is None:
+            raise HTTPException(status_code=400, detail="Input is too long for the result cache")
+        if path.exists():
+            self.counts["cached"] += 1
+            return
+        if not self.wait_for_idle(tts_engine):
+            raise RequestCancelled()
+        chunks, _ = render_audio(tts_engine, out_fmt, params, self.stopped.is_set)
+        for _ in chunks:
+            pass
+        self.counts["rendered"] += 1
+
+    def run(self) -> None:
+        global WARM_RUN, WARM_LAST
+        for item in self.items:
+            try:
+                self.warm(item)
+            except RequestCancelled:
+                break
+            except HTTPException as exc:
+                self.counts["failed"] += 1
+                self.errors.append({"input": item.get("input", "")[:80], "status": exc.status_code, "detail": exc.detail})
+            except Exception as exc:
+                logger.exception("Cache warming failed for %r", item.get("input", "")[:80])
+                self.counts["failed"] += 1
+                self.errors.append({"input": item.get("input", "")[:80], "status": 500, "detail": str(exc)})
+            self.counts["done"] += 1
+        self.status = "cancelled" if self.stopped.is_set() else "finished"
+        self.finished_at = now_iso()
+        logger.info("Cache warming %s: %s", self.status, self.counts)
+        with WARM_LOCK:
+            WARM_RUN = None
+            WARM_LAST = self
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "total": len(self.items),
+            **self.counts,
+            "progress": round(self.counts["done"] / len(self.items), 3) if self.items else 1.0,
+            "errors": list(self.errors),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def warm_items(payload: dict) -> list[dict]:
+    """Expand a warm request into speech requests: phrases (per voice) plus the top N from history."""
+    defaults = {key: payload.get(key) for key in ("model", "response_format", "speed") if payload.get(key) is not None}
+    voices = payload.get("voices") or [payload.get("voice")]
+    if not isinstance(voices, list):
+        raise HTTPException(status_code=400, detail="voices must be a list")
+    phrases = payload.get("phrases") or []
+    if not isinstance(phrases, list):
+        raise HTTPException(status_code=400, detail="phrases must be a list of strings or request objects")
+    try:
+        top = int(payload.get("top") or 0)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="top must be a number")
+    items = []
+    for phrase in phrases:
+        if isinstance(phrase, dict):
+            items.append({**defaults, **phrase})
+        elif isinstance(phrase, str) and phrase.strip():
+            items.extend({**defaults, "voice": voice, "input": phrase.strip()} for voice in voices)
+    items.extend(top_requests(top) if top > 0 else [])
+    unique = {}
+    for item in items:
+        if not str(item.get("input") or "").strip():
+            raise HTTPException(status_code=400, detail="Every phrase needs input text")
+        unique.setdefault(json.dumps(item, sort_keys=True), {key: value for key, value in item.items() if value is not None})
+    if not unique:
+        raise HTTPException(status_code=400, detail="Nothing to warm: send phrases and/or top")
+    return list(unique.values())
+
+
+def load_jobs() -> None:
+    JOB_DIR.mkdir(parents=True, exist_ok=True)
+    pending = []
+    for path in sorted(JOB_DIR.glob("*.json")):
+        job = load_json(path, None)
+        if not isinstance(job, dict) or not job.get("id"):
+            continue
+        JOBS[job["id"]] = job
+        if job["status"] in ("queued", "running"):
+            job.update(status="queued", progress=0.0, started_at=None)
+            save_job(job)
+            pending.append(job)
+    for job in sorted(pending, key=lambda item: item.get("created_at") or ""):
+        enqueue_job(job["id"])
+    if pending:
+        logger.info("Resumed %d unfinished speech jobs", len(pending))
+    prune_jobs()
+    threading.Thread(target=job_janitor, name="tts-job-janitor", daemon=True).start()
+
+
+def find_job(job_id: str, owner: Optional[str]) -> dict:
+    job = JOBS.get(job_id)
+    if not job or (owner is not None and job.get("owner") not in (None, owner)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+PROFILE_MODES = ("sampling", "deterministic")
+PROFILE_MAX_SECONDS = 600.0
+PROFILE_MAX_REQUESTS = 1000
+PROFILE_PATH_PREFIX = "/v1/tts/profile"
+PROFILE_SESSION = None
+PROFILE_LAST = None
+PROFILE_LOCK = threading.Lock()
+MODULE_FILE = str(Path(__file__).resolve())
+
+
+def thread_cpu_time(thread_id: int) -> Optional[float]:
+    if not hasattr(time, "pthread_getcpuclockid"):
+        return None
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+    except (OSError, OverflowError, ValueError):
+        return None
+
+
+def frame_label(code) -> str:
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+
+def is_proxy_code(code) -> bool:
+    return code.co_filename == MODULE_FILE
+
+
+class ProfileSession:
+    """Collects samples or call timings until a request count or time window is reached.
+
+    Sampling mode walks ``sys._current_frames()`` on a background thread and only
+    records threads serving a request (the event loop, AnyIO workers and threads in
+    ``REQUEST_THREADS``) while they execute code from this module, so idle workers
+    and the janitor, warmer and poller daemons do not show up. Deterministic mode installs a profile hook on
+    every thread (Python 3.12+) and records exact inclusive and self times.
+    """
+
+    def __init__(self, mode: str, max_requests: int, seconds: float, interval: float) -> None:
+        self.mode = mode
+        self.max_requests = max_requests
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at = now_iso()
+        self.finished_at: Optional[str] = None
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        self.requests_done = 0
+        self.inflight = 0
+        self.samples = 0
+        self.folded: dict[str, float] = {}
+        self.functions: dict[str, dict] = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.local = threading.local()
+        self.loop_threads: set[int] = set()
+        self.watcher: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return not self.stop_event.is_set()
+
+    def recording(self) -> bool:
+        return self.max_requests <= 0 or self.inflight > 0
+
+    def start(self) -> None:
+        if self.mode == "deterministic":
+            threading.setprofile_all_threads(self.profile_hook)
+        self.watcher = threading.Thread(target=self.run, name="tts-proxy-profiler", daemon=True)
+        self.watcher.start()
+
+    def finish(self) -> None:
+        global PROFILE_SESSION, PROFILE_LAST
+        with PROFILE_LOCK:
+            if not self.active:
+                return
+            self.stop_event.set()
+            if self.mode == "deterministic":
+                threading.setprofile_all_threads(None)
+            self.elapsed = time.perf_counter() - self.started
+            self.finished_at = now_iso()
+            if PROFILE_SESSION is self:
+                PROFILE_SESSION = None
+            PROFILE_LAST = self
+        logger.info("Profiling session finished after %.2fs (%d requests)", self.elapsed, self.requests_done)
+
+    def request_started(self) -> None:
+        with self.lock:
+            self.inflight += 1
+            self.loop_threads.add(threading.get_ident())
+
+    def serving_threads(self) -> set[int]:
+        with REQUEST_THREADS_LOCK:
+            serving = set(REQUEST_THREADS)
+        with self.lock:
+            serving |= self.loop_threads
+        serving.update(thread.ident for thread in threading.enumerate() if thread.name.startswith("AnyIO worker"))
+        return serving
+
+    def request_finished(self) -> None:
+        with self.lock:
+            self.inflight -= 1
+            self.requests_done += 1
+            done = self.max_requests > 0 and self.requests_done >= self.max_requests
+        if done:
+            self.finish()
+
+    def run(self) -> None:
+        deadline = self.started + self.seconds if self.seconds > 0 else None
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        last_cpu: dict[int, float] = {}
+        for thread_id in sys._current_frames():
+            cpu_now = thread_cpu_time(thread_id)
+            if cpu_now is not None:
+                last_cpu[thread_id] = cpu_now
+        while not self.stop_event.wait(self.interval if self.mode == "sampling" else 0.1):
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                self.finish()
+                return
+            dt, last = now - last, now
+            if self.mode != "sampling" or not self.recording():
+                continue
+            serving = self.serving_threads()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                cpu_now = thread_cpu_time(thread_id)
+                cpu_before = last_cpu.get(thread_id)
+                if cpu_now is not None:
+                    last_cpu[thread_id] = cpu_now
+                if thread_id not in serving:
+                    continue
+                codes = []
+                current = frame
+                while current is not None:
+                    codes.append(current.f_code)
+                    current = current.f_back
+                if not any(is_proxy_code(code) for code in codes):
+                    continue
+                codes.reverse()
+                cpu_dt = None
+                if cpu_now is not None:
+                    # Thread ids are reused, so a smaller clock means a new thread.
+                    cpu_dt = max(0.0, cpu_now - cpu_before) if cpu_before is not None else 0.0
+                self.record_sample(codes, dt, cpu_dt)
+
+    def record_sample(self, codes: list, wall: float, cpu: Optional[float]) -> None:
+        stack = ";".join(frame_label(code) for code in codes)
+        with self.lock:
+            self.samples += 1
+            self.folded[stack] = self.folded.get(stack, 0) + 1
+            for code in set(code for code in codes if is_proxy_code(code)):
+                entry = self.functions.setdefault(frame_label(code), {"wall": 0.0, "cpu": 0.0, "count": 0})
+                entry["wall"] += wall
+                entry["count"] += 1
+                if cpu is None or entry["cpu"] is None:
+                    entry["cpu"] = None
+                else:
+                    entry["cpu"] += cpu
+
+    def profile_hook(self, frame, event: str, arg: Any) -> None:
+        if event not in ("call", "return"):
+            return
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        if event == "call":
+            stack.append([frame.f_code, time.perf_counter(), time.thread_time(), 0.0])
+            return
+        if not stack:
+            return
+        code, wall_start, cpu_start, child_wall = stack.pop()
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        if stack:
+            stack[-1][3] += wall
+        if not self.recording():
+            return
+        path = ";".join(frame_label(entry[0]) for entry in stack)
+        path = f"{path};{frame_label(code)}" if path else frame_label(code)
+        with self.lock:
+            self.folded[path] = self.folded.get(path, 0) + max(0.0, wall - child_wall) * 1_000_000
+            if is_proxy_code(code) and not any(entry[0] is code for entry in stack):
+                entry = self.functions.setdefault(frame_label(code), {"wall": 0.0, "cpu": 0.0, "count": 0})
+                entry["wall"] += wall
+                entry["cpu"] += cpu
+                entry["count"] += 1
+
+    def folded_text(self) -> str:
+        with self.lock:
+            lines = [f"{stack} {int(round(weight))}" for stack, weight in sorted(self.folded.items())]
+        return "\n".join(line for line in lines if not line.endswith(" 0")) + "\n"
+
+    def report(self) -> dict:
+        with self.lock:
+            functions = [
+                {
+                    "function": name,
+                    "wall_seconds": round(entry["wall"], 6),
+                    "cpu_seconds": round(entry["cpu"], 6) if entry["cpu"] is not None else None,
+                    "samples" if self.mode == "sampling" else "calls": entry["count"],
+                }
+                for name, entry in self.functions.items()
+            ]
+        functions.sort(key=lambda item: item["wall_seconds"], reverse=True)
+        return {
+            "status": "running" if self.active else "finished",
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": self.elapsed if self.elapsed is not None else time.perf_counter() - self.started,
+            "requests": self.requests_done,
+            "max_requests": self.max_requests,
+            "seconds": self.seconds,
+            "interval_ms": self.interval * 1000 if self.mode == "sampling" else None,
+            "samples": self.samples if self.mode == "sampling" else None,
+            "folded_units": "samples" if self.mode == "sampling" else "microseconds",
+            "functions": functions,
+        }
+
+
+class ProfileMiddleware:
+    """Counts requests for the active profiling session; a single global check otherwise."""
+
+    def __init__(self, asgi_app) -> None:
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send) -> None:
+        session = PROFILE_SESSION
+        if session is None or scope["type"] != "http" or scope["path"].startswith(PROFILE_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+        session.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.request_finished()
+
+
+app.add_middleware(ProfileMiddleware)
+
+
+def health_report() -> dict:
+    """Backend, queue and thread pool state from memory only; never calls a backend.
+
+    Not ready when every backend's circuit is open, when Gradio metadata could not
+    be loaded (live or from the snapshot), or when every admission queue is full.
+    """
+    backends = []
+    for url in backend_urls():
+        admission = admission_gate(url).snapshot()
+        backends.append({
+            "breaker": backend_breaker(url).state,
+            "loaded_engine": LOADED_ENGINES.get(url),
+            "in_flight": admission["in_flight"],
+            "waiting": admission["waiting"],
+        })
+    problems = []
+    if all(backend["breaker"] == "open" for backend in backends):
+        problems.append("All Gradio backends are failing fast")
+    if METADATA_SOURCE["source"] is None and GRADIO_STATUS.get("message") and not GRADIO_STATUS.get("connected"):
+        problems.append(f"No Gradio metadata: {GRADIO_STATUS['message']}")
+    if ADMISSION_MAX_QUEUE and all(backend["waiting"] >= ADMISSION_MAX_QUEUE for backend in backends):
+        problems.append("Admission queue is full")
+    with JOBS_LOCK:
+        statuses = [job["status"] for job in JOBS.values()]
+    return {
+        "status": "degraded" if problems else "ok",
+        "ready": not problems,
+        "problems": problems,
+        "metadata": METADATA_SOURCE["source"],
+        "backends": backends,
+        "jobs": {"queued": statuses.count("queued"), "running": statuses.count("running")},
+        "threads": {
+            "synthesis": limiter_snapshot(synthesis_limiter()),
+            "control": limiter_snapshot(anyio.to_thread.current_default_thread_limiter()),
+        },
+    }
+
+
+# Both run on the event loop rather than a worker thread, so a backlog of
+# synthesis or admin calls can never delay them.
 @app.get("/health")
-def health() -> dict:
-    return {"status": "ok"}
+async def health() -> dict:
+    return health_report()
+
+
+@app.get("/health/ready")
+async def health_ready() -> Response:
+    report = health_report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
 
 
 @app.get("/", include_in_schema=False, dependencies=[Depends(require_admin)])
@@ -761,7 +3547,24 @@ def params(engine: Optional[str] = Query(default=None)) -> dict:
 def gradio_status() -> dict:
     get_default_params()
     status = GRADIO_STATUS.copy()
-    return {"connected": status.get("connected"), "message": status.get("message"), "gradio_url": status.get("url")}
+    return {
+        "connected": status.get("connected"),
+        "message": status.get("message"),
+        "gradio_url": status.get("url"),
+        "metadata": dict(METADATA_SOURCE),
+        "breaker": backend_breaker().snapshot(),
+        "admission": admission_gate().snapshot(),
+        "replicas": [
+            {
+                "url": url,
+                "loaded_engine": LOADED_ENGINES.get(url),
+                "breaker": backend_breaker(url).snapshot(),
+                "admission": admission_gate(url).snapshot(),
+            }
+            for url in backend_urls()[1:]
+        ],
+        "hedging": HEDGES.snapshot(),
+    }
 
 
 @app.post("/v1/tts/gradio", dependencies=[Depends(require_admin)])
@@ -775,8 +3578,9 @@ def set_gradio(payload: dict) -> dict:
     persist_env_value("GRADIO_URL", GRADIO_URL)
     reset_gradio_cache()
     get_default_params(force_refresh=True)
+    invalid_presets = warm_preset_plans()
     status = GRADIO_STATUS.copy()
-    return {"status": "updated", "connected": status.get("connected"), "message": status.get("message"), "gradio_url": status.get("url"), "params": list_param_specs()}
+    return {"status": "updated", "connected": status.get("connected"), "message": status.get("message"), "gradio_url": status.get("url"), "params": list_param_specs(), "invalid_presets": invalid_presets}
 
 
 @app.post("/v1/tts/gradio/reload", dependencies=[Depends(require_admin)])
@@ -790,8 +3594,9 @@ def reload_gradio() -> dict:
     os.environ["GRADIO_URL"] = GRADIO_URL
     reset_gradio_cache()
     get_default_params(force_refresh=True)
+    invalid_presets = warm_preset_plans()
     status = GRADIO_STATUS.copy()
-    return {"status": "reloaded", "connected": status.get("connected"), "message": status.get("message"), "gradio_url": status.get("url"), "params": list_param_specs()}
+    return {"status": "reloaded", "connected": status.get("connected"), "message": status.get("message"), "gradio_url": status.get("url"), "params": list_param_specs(), "invalid_presets": invalid_presets}
 
 
 @app.get("/v1/tts/voice-choices", dependencies=[Depends(require_admin)])
@@ -807,15 +3612,105 @@ def voices() -> dict:
 
 @app.get("/v1/tts/api-key", dependencies=[Depends(require_admin)])
 def api_key_status() -> dict:
-    return {"api_key": get_api_key()}
+    entries = api_key_registry()["entries"]
+    return {"api_key": get_api_key(), "keys": [public_api_key(entry) for entry in entries]}
 
 
 @app.post("/v1/tts/api-key/generate", dependencies=[Depends(require_admin)])
-def api_key_generate() -> dict:
+def api_key_generate(payload: Optional[dict] = Body(default=None)) -> dict:
+    payload = payload or {}
+    name = slugify(str(payload.get("name") or "default"))
+    limits = parse_key_limits(payload)
     ensure_data_dirs()
-    api_key = secrets.token_urlsafe(24)
-    write_api_key(api_key)
-    return {"api_key": api_key}
+    entries = load_api_keys()
+    existing = next((entry for entry in entries if entry.get("name") == name), None)
+    entry = {"name": name, "key": secrets.token_urlsafe(24), "created_at": now_iso()}
+    for field in API_KEY_LIMIT_FIELDS:
+        if field in limits:
+            entry[field] = limits[field]
+        elif existing and existing.get(field) is not None:
+            entry[field] = existing[field]
+    entries = [item for item in entries if item.get("name") != name]
+    entries.append(entry)
+    save_api_keys(entries)
+    return {"api_key": entry["key"], "key": public_api_key(entry)}
+
+
+@app.put("/v1/tts/api-key/{name}", dependencies=[Depends(require_admin)])
+def api_key_update(name: str, payload: dict) -> dict:
+    entries = load_api_keys()
+    entry = next((item for item in entries if item.get("name") == name), None)
+    if not entry:
+        raise HTTPException(status_code=404, detail="API key not found")
+    limits = parse_key_limits(payload)
+    for field in API_KEY_LIMIT_FIELDS:
+        if field in payload:
+            entry[field] = limits.get(field)
+    save_api_keys(entries)
+    return {"key": public_api_key(entry)}
+
+
+@app.delete("/v1/tts/api-key/{name}", dependencies=[Depends(require_admin)])
+def api_key_revoke(name: str) -> dict:
+    entries = load_api_keys()
+    remaining = [entry for entry in entries if entry.get("name") != name]
+    if len(remaining) == len(entries):
+        raise HTTPException(status_code=404, detail="API key not found")
+    save_api_keys(remaining)
+    return {"status": "revoked"}
+
+
+@app.post("/v1/tts/profile", dependencies=[Depends(require_admin)])
+def start_profile(payload: dict) -> dict:
+    global PROFILE_SESSION
+    mode = str(payload.get("mode") or "sampling").strip().lower()
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    if mode == "deterministic" and not hasattr(threading, "setprofile_all_threads"):
+        raise HTTPException(status_code=400, detail="Deterministic profiling requires Python 3.12+. Use mode=sampling.")
+    try:
+        max_requests = int(payload.get("requests") or 0)
+        seconds = float(payload.get("seconds") or 0)
+        interval_ms = float(payload.get("interval_ms") or 5)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="requests, seconds and interval_ms must be numbers")
+    if max_requests <= 0 and seconds <= 0:
+        max_requests = 10
+    if max_requests > PROFILE_MAX_REQUESTS or seconds > PROFILE_MAX_SECONDS or max_requests < 0 or seconds < 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"requests must be <= {PROFILE_MAX_REQUESTS} and seconds <= {PROFILE_MAX_SECONDS:g}",
+        )
+    interval = min(max(interval_ms, 1.0), 1000.0) / 1000
+    with PROFILE_LOCK:
+        if PROFILE_SESSION is not None:
+            raise HTTPException(status_code=409, detail="A profiling session is already running")
+        session = ProfileSession(mode, max_requests, seconds, interval)
+        session.start()
+        PROFILE_SESSION = session
+    logger.info("Profiling session started: mode=%s requests=%s seconds=%s", mode, max_requests, seconds)
+    return {"profile": session.report()}
+
+
+@app.get("/v1/tts/profile", dependencies=[Depends(require_admin)])
+def profile_status(format: str = Query(default="json")) -> Any:
+    session = PROFILE_SESSION or PROFILE_LAST
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    if format == "folded":
+        return PlainTextResponse(session.folded_text())
+    report = session.report()
+    report["folded"] = session.folded_text()
+    return {"profile": report}
+
+
+@app.delete("/v1/tts/profile", dependencies=[Depends(require_admin)])
+def stop_profile() -> dict:
+    session = PROFILE_SESSION
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session is running")
+    session.finish()
+    return {"profile": session.report()}
 
 
 @app.post("/v1/tts/voices", dependencies=[Depends(require_admin)])
@@ -953,17 +3848,20 @@ def create_preset(payload: dict) -> dict:
     if not label:
         label = name
 
-    presets = load_presets()
-    presets = [preset for preset in presets if preset.get("name") != name]
-    presets.append({
+    new_preset = {
         "name": name,
         "label": label,
         "engine": engine,
         "voice_id": voice_id,
         "params": params,
         "updated_at": now_iso(),
-    })
+    }
+    compile_plan(new_preset, strict=True)
+    presets = load_presets()
+    presets = [preset for preset in presets if preset.get("name") != name]
+    presets.append(new_preset)
     save_presets(presets)
+    preset_plan(new_preset)
     return {"preset": find_preset(name)}
 
 
@@ -977,9 +3875,7 @@ def delete_preset(preset_name: str) -> dict:
     return {"status": "deleted"}
 
 
-@app.get("/v1/models")
-def models(request: Request) -> dict:
-    require_api_key(request)
+def model_list() -> dict:
     engines = list_supported_engines()
     return {
         "object": "list",
@@ -987,15 +3883,7 @@ def models(request: Request) -> dict:
     }
 
 
-@app.get("/v1/audio/models")
-def audio_models(request: Request) -> dict:
-    require_api_key(request)
-    return models(request)
-
-
-@app.get("/v1/audio/voices")
-def audio_voices(request: Request) -> dict:
-    require_api_key(request)
+def voice_list() -> dict:
     presets = load_presets()
     voices = load_voices()
     seen = set()
@@ -1017,105 +3905,407 @@ def audio_voices(request: Request) -> dict:
     }
 
 
-@app.post("/v1/audio/speech")
-def speech(req: OpenAITTSSpeechRequest, request: Request) -> Response:
-    require_api_key(request)
-    text = (req.input or "").strip()
-    if not text:
-        raise HTTPException(status_code=400, detail="Missing 'input' text")
+# Builders return (payload, cacheable). The model list is only kept once Gradio
+# metadata has loaded, so engines from a late-starting backend still show up.
+DISCOVERY_BUILDERS = {
+    "models": lambda: (model_list(), bool(DEFAULT_PARAM_META)),
+    "voices": lambda: (voice_list(), True),
+}
 
-    preset = find_preset(req.voice) if req.voice else None
-    if not preset and req.voice:
-        preset = find_preset_by_label(req.voice, req.model or DEFAULT_TTS_ENGINE)
-    voice_sample = find_voice(req.voice) if req.voice and not preset else None
-    tts_engine = resolve_engine(req, preset)
-    if preset and req.model and preset.get("engine") != req.model:
-        raise HTTPException(status_code=400, detail="Preset engine does not match model")
 
-    out_fmt = resolve_output_format(req, preset)
+def discovery_payload(kind: str) -> tuple[bytes, str, int]:
+    """Serialized discovery payload, its ETag and data version, built once per version."""
+    version = data_version()
+    cached = DISCOVERY_PAYLOADS.get(kind)
+    if cached and cached[0] == version:
+        return cached[1], cached[2], version
+    payload, cacheable = DISCOVERY_BUILDERS[kind]()
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+    if cacheable:
+        with DATA_VERSION_LOCK:
+            if DATA_VERSION["version"] == version:
+                DISCOVERY_PAYLOADS[kind] = (version, body, etag)
+    return body, etag, version
 
-    defaults = get_default_params()
-    params = defaults.copy()
-    if preset and isinstance(preset.get("params"), dict):
-        params.update(preset["params"])
-    params.update({
-        "text_input": text,
-        "tts_engine": tts_engine,
-        "audio_format": out_fmt,
-    })
 
-    if voice_sample:
-        ref_param = ENGINE_REF_PARAM.get(tts_engine)
-        if ref_param:
-            params[ref_param] = handle_file(str(resolve_voice_path(voice_sample)))
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
 
-    if preset and preset.get("voice_id"):
-        ref_param = ENGINE_REF_PARAM.get(tts_engine)
-        if ref_param:
-            voice = find_voice(preset["voice_id"])
-            if voice:
-                params[ref_param] = handle_file(str(resolve_voice_path(voice)))
 
-    if req.voice and not preset and tts_engine in ENGINE_VOICE_PARAM:
-        voice_param = ENGINE_VOICE_PARAM[tts_engine]
-        if voice_param and req.voice:
-            params[voice_param] = req.voice
+def discovery_response(request: Request, kind: str) -> Response:
+    require_api_key(request, metered=False)
+    body, etag, version = discovery_payload(kind)
+    headers = {"ETag": etag, "X-Data-Version": str(version), "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
-    for key, value in list(params.items()):
-        if (
-            key in FILE_PARAM_NAMES
-            or key.endswith("_ref_audio")
-            or key.endswith("_emotion_audio")
-        ):
-            resolved = resolve_voice_reference(value) if isinstance(value, str) else None
-            if resolved:
-                params[key] = handle_file(resolved)
-            elif value in ("", None):
-                params[key] = None
-
-    required_ref_param = ENGINE_REF_PARAM.get(tts_engine)
-    if tts_engine in REQUIRED_REF_ENGINES and required_ref_param:
-        if not params.get(required_ref_param):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Reference audio is required for {tts_engine}. Save a voice sample and attach it to the preset.",
-            )
 
-    if CHATTERBOX_TURBO_REF_AUDIO:
-        if not os.path.isfile(CHATTERBOX_TURBO_REF_AUDIO):
-            raise HTTPException(
-                status_code=500,
-                detail="CHATTERBOX_TURBO_REF_AUDIO path does not exist",
-            )
-        params["chatterbox_turbo_ref_audio"] = handle_file(
-            CHATTERBOX_TURBO_REF_AUDIO
-        )
+@app.get("/v1/models")
+def models(request: Request) -> Response:
+    return discovery_response(request, "models")
+
+
+@app.get("/v1/audio/models")
+def audio_models(request: Request) -> Response:
+    return discovery_response(request, "models")
+
+
+@app.get("/v1/audio/voices")
+def audio_voices(request: Request) -> Response:
+    return discovery_response(request, "voices")
+
 
+@app.get("/v1/tts/changes")
+async def discovery_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    timeout: float = Query(30.0, ge=0),
+) -> dict:
+    """Long-poll until the data version differs from ``since`` (or the timeout passes)."""
+    await run_control(require_api_key, request, metered=False)
+    deadline = time.monotonic() + min(timeout, CHANGE_FEED_MAX_WAIT)
+    # data_version() may stat the JSON stores, so it stays off the event loop.
+    version = await run_control(data_version)
+    while version == since and time.monotonic() < deadline:
+        if await request.is_disconnected():
+            break
+        await asyncio.sleep(CHANGE_FEED_POLL_INTERVAL)
+        version = await run_control(data_version)
+    return {"version": version, "changed": version != since}
+
+
+@app.get("/v1/tts/changes/stream")
+async def discovery_change_stream(request: Request) -> StreamingResponse:
+    """Server-sent events: one ``version`` event now and one per change after that."""
+    await run_control(require_api_key, request, metered=False)
+    last_event = request.headers.get("last-event-id", "")
+    sent = int(last_event) if last_event.isdigit() else 0
+
+    async def events():
+        nonlocal sent
+        idle = 0.0
+        while not await request.is_disconnected():
+            version = await run_control(data_version)
+            if version != sent:
+                sent = version
+                idle = 0.0
+                yield f"id: {version}\nevent: version\ndata: {json.dumps({'version': version})}\n\n"
+            elif idle >= CHANGE_FEED_KEEPALIVE:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(CHANGE_FEED_POLL_INTERVAL)
+            idle += CHANGE_FEED_POLL_INTERVAL
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+BACKGROUND_TASKS: set[asyncio.Future] = set()
+
+
+def log_task_exception(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed", exc_info=task.exception())
+
+
+SPEECH_EVENTS_KEEPALIVE = 15.0
+SPEECH_EVENT_AUDIO_CHUNK = 48 * 1024
+
+
+async def speech_progress_events(tts_engine: str, out_fmt: str, params: dict) -> Any:
+    """Server-sent events for one synthesis: queue and progress updates, then the audio.
+
+    Every event is a ``data:`` line holding JSON with a ``type``: ``speech.queue``,
+    ``speech.progress``, ``speech.audio.delta`` (base64 audio), ``speech.audio.done``
+    or ``error``. Repeated identical updates are dropped, and a client disconnect
+    cancels the request.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    closed = threading.Event()
+    last: list[Optional[dict]] = [None]
+
+    def emit(event: Optional[dict]) -> None:
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    def report(event: dict) -> None:
+        if event != last[0]:
+            last[0] = event
+            emit(event)
+
+    def run() -> None:
+        try:
+            chunks, _ = render_audio(tts_engine, out_fmt, params, closed.is_set, report)
+            size = 0
+            pending = b""
+            for chunk in chunks:
+                pending += chunk
+                size += len(chunk)
+                while len(pending) >= SPEECH_EVENT_AUDIO_CHUNK:
+                    audio, pending = pending[:SPEECH_EVENT_AUDIO_CHUNK], pending[SPEECH_EVENT_AUDIO_CHUNK:]
+                    emit({"type": "speech.audio.delta", "audio": base64.b64encode(audio).decode("ascii")})
+            if pending:
+                emit({"type": "speech.audio.delta", "audio": base64.b64encode(pending).decode("ascii")})
+            emit({"type": "speech.audio.done", "format": out_fmt, "bytes": size})
+        except HTTPException as exc:
+            emit({"type": "error", "status": exc.status_code, "detail": exc.detail})
+        except Exception as exc:
+            logger.exception("Speech progress stream failed")
+            emit({"type": "error", "status": 500, "detail": str(exc)})
+        finally:
+            emit(None)
+
+    # Runs on its own; once the stream closes it notices through ``closed`` and stops.
+    task = asyncio.ensure_future(run_synthesis(run))
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+    task.add_done_callback(log_task_exception)
     try:
-        client = Client(GRADIO_URL)
-        if AUTO_LOAD_ENGINE and ENGINE_LOAD_API.get(tts_engine):
-            global LOADED_ENGINE
-            if LOADED_ENGINE != tts_engine:
-                logger.info("Loading engine: %s", tts_engine)
-                client.predict(api_name=ENGINE_LOAD_API[tts_engine])
-                LOADED_ENGINE = tts_engine
-        result = client.predict(api_name=GRADIO_API_NAME, **params)
-    except Exception as exc:
-        safe_params = {}
-        for key, value in params.items():
-            if key in FILE_PARAM_NAMES or key.endswith("_ref_audio") or key.endswith("_emotion_audio"):
-                safe_params[key] = "file"
-            else:
-                safe_params[key] = value
-        logger.exception("Gradio call failed for engine %s with params %s", tts_engine, safe_params)
-        raise HTTPException(status_code=502, detail=f"Gradio call failed: {exc}")
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), SPEECH_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield f"data: {json.dumps(event)}\n\n"
+        await task
+    finally:
+        # On a disconnect the generator closes inside a cancelled scope, so the task
+        # is not awaited here; BACKGROUND_TASKS keeps it alive until ``run`` stops.
+        closed.set()
 
-    audio_path = result[0] if isinstance(result, (list, tuple)) else result
-    if not audio_path or not os.path.exists(audio_path):
-        raise HTTPException(status_code=502, detail="No audio file returned")
 
-    with open(audio_path, "rb") as audio_file:
-        audio_bytes = audio_file.read()
+@app.post("/v1/audio/speech")
+async def speech(req: OpenAITTSSpeechRequest, request: Request) -> Response:
+    await run_control(require_api_key, request, chars=len(req.input or ""))
+    await run_control(record_request_history, req)
+    if req.stream_format == "sse" or "text/event-stream" in request.headers.get("accept", ""):
+        tts_engine, out_fmt, params = await run_synthesis(build_speech_params, req)
+        return StreamingResponse(
+            speech_progress_events(tts_engine, out_fmt, params),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    chunks, out_fmt, length = await run_synthesis(
+        synthesize_speech_stream, req, lambda: anyio.from_thread.run(request.is_disconnected)
+    )
+    headers = {"Content-Length": str(length)} if length is not None else None
+    return StreamingResponse(iterate_synthesis(chunks), media_type=audio_media_type(out_fmt), headers=headers)
+
 
-    media_type = "audio/mpeg" if out_fmt == "mp3" else "audio/wav"
-    return Response(content=audio_bytes, media_type=media_type)
+@app.post("/v1/audio/speech/jobs", status_code=202)
+def create_speech_job(req: SpeechJobRequest, request: Request) -> dict:
+    owner = require_api_key(request, chars=len(req.input or ""))
+    if not (req.input or "").strip():
+        raise HTTPException(status_code=400, detail="Missing 'input' text")
+    if req.webhook_url:
+        problem = webhook_url_error(req.webhook_url)
+        if problem:
+            raise HTTPException(status_code=400, detail=problem)
+    JOB_DIR.mkdir(parents=True, exist_ok=True)
+    job_id = secrets.token_hex(12)
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "progress": 0.0,
+        "created_at": now_iso(),
+        "owner": owner,
+        "webhook_url": req.webhook_url,
+        "fanout": req.fanout,
+        "request": req.model_dump(exclude={"webhook_url", "fanout"}),
+    }
+    with JOBS_LOCK:
+        JOBS[job_id] = job
+        created = public_job(job)
+    save_job(job)
+    enqueue_job(job_id)
+    return created
+
+
+@app.get("/v1/audio/speech/jobs/{job_id}")
+def speech_job(job_id: str, request: Request) -> dict:
+    owner = require_api_key(request)
+    return public_job(find_job(job_id, owner))
+
+
+@app.get("/v1/audio/speech/jobs/{job_id}/content")
+def speech_job_content(job_id: str, request: Request) -> Response:
+    owner = require_api_key(request)
+    job = find_job(job_id, owner)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    result_path = job_result_path(job)
+    if result_path is None or not result_path.exists():
+        raise HTTPException(status_code=410, detail="Job result expired")
+    # FileResponse answers Range requests with 206 partial content.
+    return FileResponse(result_path, media_type=audio_media_type(job.get("response_format") or DEFAULT_FORMAT))
+
+
+@app.delete("/v1/audio/speech/jobs/{job_id}")
+def delete_speech_job(job_id: str, request: Request) -> dict:
+    owner = require_api_key(request)
+    job = find_job(job_id, owner)
+    with JOBS_LOCK:
+        deleted = job["status"] not in ("running", "queued")
+        if job["status"] == "running":
+            # Takes effect at the next admission check or when the current clip finishes.
+            job["cancel_requested"] = True
+        elif job["status"] == "queued":
+            job.update(status="cancelled", finished_at=now_iso(), finished_ts=time.time())
+        else:
+            JOBS.pop(job_id, None)
+        public = public_job(job)
+    if deleted:
+        delete_job_files(job)
+        return {"status": "deleted"}
+    save_job(job)
+    return public
+
+
+@app.get("/v1/tts/cache", dependencies=[Depends(require_admin)])
+def result_cache_status() -> dict:
+    with RESULT_CACHE_LOCK:
+        entries = result_cache_files()
+        stats = dict(RESULT_CACHE_STATS)
+    with REQUEST_HISTORY_LOCK:
+        history = len(REQUEST_HISTORY)
+    return {
+        "enabled": RESULT_CACHE_MB > 0,
+        "max_mb": RESULT_CACHE_MB,
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _ in entries),
+        **stats,
+        "history": history,
+    }
+
+
+@app.delete("/v1/tts/cache", dependencies=[Depends(require_admin)])
+def purge_result_cache() -> dict:
+    removed = 0
+    with RESULT_CACHE_LOCK:
+        for _, _, path in result_cache_files():
+            try:
+                path.unlink(missing_ok=True)
+                removed += 1
+            except PermissionError:
+                pass  # still being streamed on Windows
+    return {"status": "purged", "removed": removed}
+
+
+@app.post("/v1/tts/cache/warm", dependencies=[Depends(require_admin)])
+def start_cache_warm(payload: dict) -> dict:
+    global WARM_RUN
+    if RESULT_CACHE_MB <= 0:
+        raise HTTPException(status_code=400, detail="The result cache is disabled (RESULT_CACHE_MB=0)")
+    items = warm_items(payload)
+    with WARM_LOCK:
+        if WARM_RUN is not None:
+            raise HTTPException(status_code=409, detail="Cache warming is already running")
+        WARM_RUN = CacheWarmer(items)
+        WARM_RUN.start()
+        run = WARM_RUN
+    logger.info("Cache warming started: %d requests", len(items))
+    return {"warm": run.report()}
+
+
+@app.get("/v1/tts/cache/warm", dependencies=[Depends(require_admin)])
+def cache_warm_status() -> dict:
+    run = WARM_RUN or WARM_LAST
+    if run is None:
+        raise HTTPException(status_code=404, detail="No cache warming run")
+    return {"warm": run.report()}
+
+
+@app.delete("/v1/tts/cache/warm", dependencies=[Depends(require_admin)])
+def stop_cache_warm() -> dict:
+    run = WARM_RUN
+    if run is None:
+        raise HTTPException(status_code=404, detail="Cache warming is not running")
+    run.stopped.set()
+    return {"warm": run.report()}
+
+
+@app.websocket("/v1/audio/speech/realtime")
+async def speech_realtime(websocket: WebSocket) -> None:
+    # Browsers cannot set headers on WebSockets, so the key may also come as ?api_key=.
+    token = websocket.query_params.get("api_key")
+    try:
+        await run_control(require_api_key, websocket, token=token)
+    except HTTPException as exc:
+        await websocket.close(code=1008, reason=str(exc.detail))
+        return
+    settings = {key: websocket.query_params[key] for key in REALTIME_SETTINGS if websocket.query_params.get(key)}
+    problem = realtime_settings_error(settings)
+    if problem:
+        await websocket.close(code=1008, reason=f"Invalid settings: {problem}")
+        return
+    await websocket.accept()
+    session = {"generation": 0, "settings": settings}
+    queue: asyncio.Queue = asyncio.Queue()
+    worker = asyncio.create_task(realtime_worker(websocket, queue, session, token))
+    buffer = ""
+    seq = 0
+
+    async def dispatch(segment: str) -> None:
+        nonlocal seq
+        seq += 1
+        await websocket.send_json({"type": "segment", "seq": seq, "text": segment})
+        await queue.put(("speak", session["generation"], seq, segment))
+
+    try:
+        while True:
+            try:
+                message = await receive_realtime_message(websocket)
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "session.update":
+                updated = dict(session["settings"], **{key: message[key] for key in REALTIME_SETTINGS if key in message})
+                problem = realtime_settings_error(updated)
+                if problem:
+                    await websocket.send_json({"type": "error", "status": 400, "detail": f"Invalid settings: {problem}"})
+                    continue
+                session["settings"] = updated
+                await websocket.send_json({"type": "session.updated", "settings": session["settings"]})
+            elif kind == "text":
+                buffer += str(message.get("text") or "")
+                segments, buffer = split_ready_segments(buffer)
+                for segment in segments:
+                    await dispatch(segment)
+            elif kind == "flush":
+                if buffer.strip():
+                    await dispatch(buffer.strip())
+                buffer = ""
+                await queue.put(("flush", session["generation"], seq, ""))
+            elif kind == "cancel":
+                buffer = ""
+                session["generation"] += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                await websocket.send_json({"type": "cancelled", "seq": seq})
+            elif kind == "close":
+                break
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        try:
+            await worker
+        except (asyncio.CancelledError, WebSocketDisconnect):
+            pass
+        except Exception:
+            logger.exception("Realtime worker failed")
+    try:
+        await websocket.close()
+    except RuntimeError:
+        pass
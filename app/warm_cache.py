@@ -0,0 +1,75 @@
+"""Warm the proxy's result cache from a phrase list or recorded request history.
+
+Posts to ``/v1/tts/cache/warm`` and follows the run until it finishes. Phrases are
+rendered one at a time whenever the backend is idle, so this is safe to run
+against a live proxy. The proxy needs ``RESULT_CACHE_MB`` set, since the cache is
+off by default. Run from the ``app`` folder:
+
+    python warm_cache.py --url http://127.0.0.1:42025 --phrases prompts.txt \\
+        --voice matt-chatterbox-turbo --voice support-kokoro
+    python warm_cache.py --url http://127.0.0.1:42025 --top 100
+
+``--phrases`` takes one phrase per line (blank lines and ``#`` comments are
+skipped). Admin credentials default to ``ADMIN_USERNAME`` / ``ADMIN_PASSWORD``.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+
+def read_phrases(path: str) -> list[str]:
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:42025", help="Base URL of the running proxy.")
+    parser.add_argument("--phrases", help="File with one phrase per line.")
+    parser.add_argument("--voice", action="append", default=[], help="Preset or voice to render each phrase with; repeatable.")
+    parser.add_argument("--model")
+    parser.add_argument("--format", dest="response_format")
+    parser.add_argument("--speed", type=float)
+    parser.add_argument("--top", type=int, default=0, help="Also warm the N most frequent recorded requests.")
+    parser.add_argument("--user", default=os.environ.get("ADMIN_USERNAME", ""))
+    parser.add_argument("--password", default=os.environ.get("ADMIN_PASSWORD", ""))
+    parser.add_argument("--no-wait", action="store_true", help="Start the run and exit without following it.")
+    parser.add_argument("--poll", type=float, default=2.0, help="Seconds between progress checks.")
+    args = parser.parse_args()
+
+    payload = {"phrases": read_phrases(args.phrases) if args.phrases else [], "top": args.top}
+    if args.voice:
+        payload["voices"] = args.voice
+    for key in ("model", "response_format", "speed"):
+        if getattr(args, key) is not None:
+            payload[key] = getattr(args, key)
+    auth = (args.user, args.password) if args.user else None
+    endpoint = args.url.rstrip("/") + "/v1/tts/cache/warm"
+
+    with httpx.Client(auth=auth, timeout=30.0) as client:
+        resp = client.post(endpoint, json=payload)
+        if resp.status_code != 200:
+            print(f"Warm request failed ({resp.status_code}): {resp.text}", file=sys.stderr)
+            return 1
+        run = resp.json()["warm"]
+        print(f"Warming {run['total']} requests")
+        while not args.no_wait and run["status"] == "running":
+            time.sleep(args.poll)
+            run = client.get(endpoint).json()["warm"]
+            print(
+                f"  {run['done']}/{run['total']} done: {run['rendered']} rendered, "
+                f"{run['cached']} already cached, {run['failed']} failed"
+            )
+    if run["errors"]:
+        print(json.dumps(run["errors"], indent=2))
+    return 1 if run["status"] != "running" and run["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,7 @@ module.exports = {
           "CHATTERBOX_TURBO_REF_AUDIO": "{{envs.CHATTERBOX_TURBO_REF_AUDIO ? envs.CHATTERBOX_TURBO_REF_AUDIO : (args.chatterbox_turbo_ref_audio ? args.chatterbox_turbo_ref_audio : '')}}",
           "AUTO_LOAD_ENGINE": "{{envs.AUTO_LOAD_ENGINE ? envs.AUTO_LOAD_ENGINE : 'true'}}",
           "LOG_LEVEL": "{{envs.LOG_LEVEL ? envs.LOG_LEVEL : 'INFO'}}",
+          "PRELOAD_GRADIO_CLIENT": "{{envs.PRELOAD_GRADIO_CLIENT ? envs.PRELOAD_GRADIO_CLIENT : 'true'}}",
           "ADMIN_USERNAME": "{{envs.ADMIN_USERNAME ? envs.ADMIN_USERNAME : ''}}",
           "ADMIN_PASSWORD": "{{envs.ADMIN_PASSWORD ? envs.ADMIN_PASSWORD : ''}}",
           "HF_HUB_DISABLE_TELEMETRY": "1",
@@ -0,0 +1,91 @@
+"""Shared fixtures: a scratch data folder, ``bench/fake_gradio.py`` backends and a proxy client.
+
+The proxy reads its settings when imported, so the data folder, settings file and
+result cache are pointed at scratch locations before ``tts_proxy`` is imported.
+Settings read at call time (``BACKEND_CONCURRENCY``, ``ADMISSION_MAX_QUEUE`` ...)
+are changed per test with ``monkeypatch``.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+SCRATCH = tempfile.TemporaryDirectory(prefix="tts_proxy_tests_")
+ENV_FILE = Path(SCRATCH.name) / "ENVIRONMENT"
+ENV_FILE.write_text("", encoding="utf-8")
+os.environ.update(
+    PROXY_DATA_DIR=str(Path(SCRATCH.name) / "data"),
+    PROXY_ENV_FILE=str(ENV_FILE),
+    RESULT_CACHE_MB="0",
+    REQUEST_HISTORY_SIZE="0",
+    PRELOAD_GRADIO_CLIENT="false",
+    LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+)
+sys.path.insert(0, str(APP_DIR))
+
+import tts_proxy  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def fake_backend():
+    """Start ``fake_gradio.py`` backends; call with its options, e.g. ``fake_backend(latency_ms=500)``."""
+    procs = []
+
+    def start(port: int = 0, **options) -> str:
+        port = port or free_port()
+        options = {"latency_ms": 50, "jitter_ms": 0, "load_ms": 0, "audio_kb": 4, **options}
+        args = [sys.executable, str(APP_DIR / "bench" / "fake_gradio.py"), "--port", str(port)]
+        for name, value in options.items():
+            args += ["--" + name.replace("_", "-"), str(value)]
+        proc = subprocess.Popen(args, cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        procs.append(proc)
+        url = f"http://127.0.0.1:{port}/"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(url + "config", timeout=1.0).status_code == 200:
+                    return url
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"fake backend on port {port} did not start")
+            time.sleep(0.1)
+
+    yield start
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+@pytest.fixture
+def use_backend(monkeypatch):
+    """Point the proxy at ``url`` (plus ``replicas``) with fresh gates, breakers and metadata."""
+
+    def use(url: str, replicas: tuple[str, ...] = ()) -> None:
+        monkeypatch.setattr(tts_proxy, "GRADIO_URL", url)
+        monkeypatch.setattr(tts_proxy, "GRADIO_REPLICAS", ",".join(replicas))
+        monkeypatch.setattr(tts_proxy, "ADMISSION_GATES", {})
+        monkeypatch.setattr(tts_proxy, "BREAKERS", {})
+        monkeypatch.setattr(tts_proxy, "SYNTHESIS_LIMITER", None)
+        tts_proxy.reset_gradio_cache()
+
+    yield use
+    tts_proxy.reset_gradio_cache()
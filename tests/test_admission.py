@@ -0,0 +1,98 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import tts_proxy
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    monkeypatch.setattr(tts_proxy, "BACKEND_CONCURRENCY", 1)
+    monkeypatch.setattr(tts_proxy, "ENGINE_LIMITS", {})
+    monkeypatch.setattr(tts_proxy, "ADMISSION_CHECK_INTERVAL", 0.02)
+    return tts_proxy.AdmissionGate("http://gate.test/")
+
+
+def test_full_queue_is_shed(gate, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "ADMISSION_MAX_QUEUE", 1)
+    monkeypatch.setattr(tts_proxy, "ADMISSION_TIMEOUT", 5)
+    gate.acquire("Kokoro TTS")
+    waiter = threading.Thread(target=gate.acquire, args=("Kokoro TTS",))
+    waiter.start()
+    while not gate.waiters:
+        time.sleep(0.01)
+    with pytest.raises(HTTPException) as exc:
+        gate.acquire("Kokoro TTS")
+    assert exc.value.status_code == 503
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    assert gate.shed["full"] == 1
+    gate.release("Kokoro TTS", 0.1)
+    waiter.join(timeout=5)
+    assert gate.in_flight == 1
+
+
+def test_wait_times_out(gate, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "ADMISSION_TIMEOUT", 0.2)
+    gate.acquire("Kokoro TTS")
+    started = time.monotonic()
+    with pytest.raises(HTTPException) as exc:
+        gate.acquire("Kokoro TTS")
+    assert exc.value.status_code == 503
+    assert 0.2 <= time.monotonic() - started < 2
+    assert gate.shed["timeout"] == 1
+    assert gate.waiters == []
+
+
+def test_engine_limit_lets_other_engines_pass(gate, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "BACKEND_CONCURRENCY", 2)
+    monkeypatch.setattr(tts_proxy, "ENGINE_LIMITS", {"Kokoro TTS": 1})
+    monkeypatch.setattr(tts_proxy, "ADMISSION_TIMEOUT", 0.2)
+    gate.acquire("Kokoro TTS")
+    with pytest.raises(HTTPException):
+        gate.acquire("Kokoro TTS")
+    assert gate.acquire("KittenTTS") >= 0
+    assert gate.snapshot()["engine_in_flight"] == {"Kokoro TTS": 1, "KittenTTS": 1}
+
+
+def test_synthesis_threads_cover_every_gate(monkeypatch):
+    monkeypatch.setattr(tts_proxy, "SYNTHESIS_THREADS", 4)
+    monkeypatch.setattr(tts_proxy, "BACKEND_CONCURRENCY", 2)
+    monkeypatch.setattr(tts_proxy, "ADMISSION_MAX_QUEUE", 64)
+    monkeypatch.setattr(tts_proxy, "GRADIO_REPLICAS", "http://replica.test:7860")
+    assert tts_proxy.synthesis_thread_count() == 2 * (2 + 64) + tts_proxy.SYNTHESIS_SPARE_THREADS
+
+
+def test_overload_is_shed_with_503_instead_of_hanging(fake_backend, use_backend, monkeypatch):
+    # One backend slot, two queue places and a single configured synthesis thread:
+    # the limiter must still leave room for requests to reach the gate and be shed.
+    use_backend(fake_backend(latency_ms=1500))
+    monkeypatch.setattr(tts_proxy, "SYNTHESIS_THREADS", 1)
+    monkeypatch.setattr(tts_proxy, "BACKEND_CONCURRENCY", 1)
+    monkeypatch.setattr(tts_proxy, "ADMISSION_MAX_QUEUE", 2)
+    monkeypatch.setattr(tts_proxy, "ADMISSION_TIMEOUT", 30)
+    with TestClient(tts_proxy.app) as client:
+        assert client.post(
+            "/v1/audio/speech", json={"input": "warm up", "model": "Kokoro TTS", "voice": "af_heart", "response_format": "wav"}
+        ).status_code == 200
+
+        def speak(index: int) -> tuple[int, float]:
+            started = time.monotonic()
+            resp = client.post(
+                "/v1/audio/speech",
+                json={"input": f"request {index}", "model": "Kokoro TTS", "voice": "af_heart", "response_format": "wav"},
+            )
+            return resp.status_code, time.monotonic() - started
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(speak, range(8)))
+
+    codes = [code for code, _ in results]
+    assert codes.count(200) >= 3
+    assert codes.count(503) >= 3
+    assert set(codes) <= {200, 503}
+    # Shed requests are answered right away, not after waiting behind the others.
+    assert max(elapsed for code, elapsed in results if code == 503) < 1.5
@@ -0,0 +1,80 @@
+import io
+import math
+import wave
+from array import array
+
+import pytest
+from fastapi import HTTPException
+
+import tts_proxy
+
+RATE = 8000
+
+
+def tone(amplitude: int, seconds: float = 0.5, rate: int = RATE, channels: int = 1, lead: float = 0.1) -> bytes:
+    """A WAV clip: ``lead`` seconds of silence, a 440 Hz tone, then silence again."""
+    silence = [0] * int(rate * lead)
+    body = [int(amplitude * math.sin(2 * math.pi * 440 * i / rate)) for i in range(int(rate * seconds))]
+    samples = array("h", [value for value in silence + body + silence for _ in range(channels)])
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def clip_peaks(data: bytes, timings: list) -> list[int]:
+    _, samples = tts_proxy.read_pcm16(data)
+    return [tts_proxy.peak(samples[int(start * RATE):int(end * RATE)]) for start, end in timings]
+
+
+def test_clips_are_leveled_towards_the_median():
+    timings = []
+    joined = tts_proxy.join_wav_segments([tone(8000), tone(6000), tone(10000)], [False, False], timings)
+    peaks = clip_peaks(joined, timings)
+    assert all(abs(value - 8000) < 300 for value in peaks)
+
+
+def test_quiet_outlier_is_boosted_at_most_max_gain():
+    timings = []
+    joined = tts_proxy.join_wav_segments([tone(8000), tone(8000), tone(800)], [False, False], timings)
+    assert clip_peaks(joined, timings)[2] == pytest.approx(800 * tts_proxy.FANOUT_MAX_GAIN, rel=0.02)
+
+
+def test_loud_outlier_is_cut_at_most_max_gain():
+    timings = []
+    joined = tts_proxy.join_wav_segments([tone(2000), tone(2000), tone(20000)], [False, False], timings)
+    peaks = clip_peaks(joined, timings)
+    assert peaks[2] == pytest.approx(20000 / tts_proxy.FANOUT_MAX_GAIN, rel=0.02)
+    assert peaks[0] == pytest.approx(2000, rel=0.02)
+
+
+def test_gain_never_clips():
+    timings = []
+    joined = tts_proxy.join_wav_segments([tone(30000), tone(30000), tone(20000, seconds=0.02)], [False, False], timings)
+    assert max(clip_peaks(joined, timings)) <= 32767
+
+
+def test_edges_are_trimmed_and_pauses_follow_paragraphs(monkeypatch):
+    monkeypatch.setattr(tts_proxy, "FANOUT_JOIN_MS", 100)
+    timings = []
+    tts_proxy.join_wav_segments([tone(8000), tone(8000), tone(8000)], [True, False], timings)
+    (start1, end1), (start2, end2), (start3, _) = timings
+    assert end1 - start1 < 0.55
+    assert start2 - end1 == pytest.approx(0.2, abs=0.01)
+    assert start3 - end2 == pytest.approx(0.1, abs=0.01)
+
+
+def test_mismatched_formats_are_rejected():
+    with pytest.raises(HTTPException) as exc:
+        tts_proxy.join_wav_segments([tone(8000), tone(8000, rate=16000)], [False])
+    assert exc.value.status_code == 502
+
+
+def test_stereo_is_kept():
+    joined = tts_proxy.join_wav_segments([tone(8000, channels=2), tone(4000, channels=2)], [False])
+    with wave.open(io.BytesIO(joined)) as wav:
+        assert wav.getnchannels() == 2
+        assert wav.getframerate() == RATE
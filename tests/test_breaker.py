@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import tts_proxy
+from conftest import free_port
+
+INFO = {"named_endpoints": {}}
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(tts_proxy, "BREAKER_WINDOW", 10)
+    monkeypatch.setattr(tts_proxy, "BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(tts_proxy, "BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(tts_proxy, "BREAKER_OPEN_SECONDS", 10.0)
+    return tts_proxy.CircuitBreaker("http://breaker.test/")
+
+
+def expire(breaker: tts_proxy.CircuitBreaker) -> None:
+    breaker.opened_at = time.monotonic() - tts_proxy.BREAKER_OPEN_SECONDS
+
+
+def test_opens_at_the_error_rate_after_min_calls(breaker):
+    for _ in range(3):
+        breaker.record_failure("boom")
+    assert breaker.state == "closed"
+    breaker.record_failure("boom")
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.snapshot()["retry_after"] == 10
+
+
+def test_successes_keep_it_closed(breaker):
+    for _ in range(5):
+        breaker.record_success()
+        breaker.record_failure("flaky")
+        breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["error_rate"] == pytest.approx(0.3)
+
+
+def test_trip_opens_right_away(breaker):
+    breaker.record_failure("connection refused", trip=True)
+    assert breaker.state == "open"
+    assert breaker.last_error == "connection refused"
+
+
+def test_half_open_probe_closes_and_its_info_is_reused_once(breaker, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "probe_backend", lambda url: INFO)
+    breaker.record_failure("down", trip=True)
+    expire(breaker)
+    assert breaker.allow()
+    assert breaker.snapshot() == {
+        "state": "closed", "calls": 1, "failures": 0, "error_rate": 0.0, "retry_after": None, "last_error": ""
+    }
+    assert breaker.take_probe_info() == INFO
+    assert breaker.take_probe_info() is None
+
+
+def test_stale_probe_info_is_not_reused(breaker, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "probe_backend", lambda url: INFO)
+    breaker.record_failure("down", trip=True)
+    expire(breaker)
+    assert breaker.allow()
+    breaker.probe_info = (time.monotonic() - tts_proxy.BREAKER_PROBE_REUSE_SECONDS, INFO)
+    assert breaker.take_probe_info() is None
+
+
+def test_failed_probe_reopens(breaker, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "probe_backend", lambda url: None)
+    breaker.record_failure("down", trip=True)
+    expire(breaker)
+    assert not breaker.allow()
+    assert breaker.state == "open"
+    assert not breaker.probing
+    assert breaker.retry_after() == 10
+
+
+def test_only_one_caller_probes(breaker, monkeypatch):
+    release = threading.Event()
+    probes = []
+
+    def slow_probe(url):
+        probes.append(url)
+        release.wait(5)
+        return INFO
+
+    monkeypatch.setattr(tts_proxy, "probe_backend", slow_probe)
+    breaker.record_failure("down", trip=True)
+    expire(breaker)
+    results = []
+    prober = threading.Thread(target=lambda: results.append(breaker.allow()))
+    prober.start()
+    while not probes:
+        time.sleep(0.01)
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    release.set()
+    prober.join(timeout=5)
+    assert results == [True]
+    assert len(probes) == 1
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("retries", [0, 2])
+def test_backend_retries_sets_the_attempts(monkeypatch, retries):
+    monkeypatch.setattr(tts_proxy, "BACKEND_RETRIES", retries)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise OSError("refused")
+
+    with pytest.raises(OSError):
+        tts_proxy.retry_idempotent(fail, base_delay=0.001)
+    assert len(calls) == retries + 1
+
+
+def test_dead_backend_fails_fast_then_recovers(fake_backend, use_backend, monkeypatch):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    use_backend(url)
+    monkeypatch.setattr(tts_proxy, "BACKEND_RETRIES", 0)
+    body = {"input": "hello", "model": "Kokoro TTS", "voice": "af_heart", "response_format": "wav"}
+    with TestClient(tts_proxy.app) as client:
+        resp = client.post("/v1/audio/speech", json=body)
+        assert resp.status_code == 503
+        assert tts_proxy.backend_breaker(url).state == "open"
+        started = time.monotonic()
+        resp = client.post("/v1/audio/speech", json=body)
+        assert resp.status_code == 503
+        assert int(resp.headers["Retry-After"]) >= 1
+        assert time.monotonic() - started < 0.5
+
+        fake_backend(port=port)
+        expire(tts_proxy.backend_breaker(url))
+        assert client.post("/v1/audio/speech", json=body).status_code == 200
+        assert tts_proxy.backend_breaker(url).state == "closed"
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+import tts_proxy
+
+
+class Loader:
+    """Counts calls and returns ``{"version": n}``; ``gate`` holds calls back until set."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error = None
+
+    def __call__(self) -> dict:
+        self.calls += 1
+        self.gate.wait(5)
+        if self.error:
+            raise self.error
+        return {"version": self.calls, "items": ["a"]}
+
+
+@pytest.fixture
+def loader():
+    return Loader()
+
+
+def expire(cache: tts_proxy.TTLCache, key) -> None:
+    value, _ = cache.entries[key]
+    cache.entries[key] = (value, time.monotonic() - 1)
+
+
+def wait_refreshed(cache: tts_proxy.TTLCache, key) -> None:
+    deadline = time.monotonic() + 5
+    while key in cache.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_hits_do_not_reload(loader):
+    cache = tts_proxy.TTLCache(60)
+    assert cache.get("k", loader) == {"version": 1, "items": ["a"]}
+    assert cache.get("k", loader) == {"version": 1, "items": ["a"]}
+    assert loader.calls == 1
+
+
+def test_callers_get_their_own_copy(loader):
+    cache = tts_proxy.TTLCache(60)
+    first = cache.get("k", loader)
+    first["items"].append("edited")
+    first["version"] = 99
+    second = cache.get("k", loader)
+    assert second == {"version": 1, "items": ["a"]}
+    assert second is not cache.get("k", loader)
+
+
+def test_uncacheable_values_are_loaded_again(loader):
+    cache = tts_proxy.TTLCache(60)
+    cache.get("k", loader, lambda value: False)
+    cache.get("k", loader, lambda value: False)
+    assert loader.calls == 2
+    assert "k" not in cache.entries
+
+
+def test_expired_entry_is_served_while_one_refresh_runs(loader):
+    cache = tts_proxy.TTLCache(60)
+    cache.get("k", loader)
+    expire(cache, "k")
+    loader.gate.clear()
+    started = time.monotonic()
+    stale = [cache.get("k", loader) for _ in range(5)]
+    assert time.monotonic() - started < 1
+    assert all(value["version"] == 1 for value in stale)
+    assert cache.refreshing == {"k"}
+    loader.gate.set()
+    wait_refreshed(cache, "k")
+    assert loader.calls == 2
+    assert cache.get("k", loader)["version"] == 2
+
+
+def test_failed_refresh_keeps_the_stale_value(loader):
+    cache = tts_proxy.TTLCache(60)
+    cache.get("k", loader)
+    expire(cache, "k")
+    loader.error = OSError("backend down")
+    assert cache.get("k", loader)["version"] == 1
+    wait_refreshed(cache, "k")
+    assert cache.refreshing == set()
+    assert cache.get("k", loader)["version"] == 1
+    wait_refreshed(cache, "k")
+    # Still expired, so every get after a failure tries again.
+    assert loader.calls == 3
+
+
+def test_clear_forces_a_load(loader):
+    cache = tts_proxy.TTLCache(60)
+    cache.get("k", loader)
+    cache.clear()
+    assert cache.get("k", loader)["version"] == 2
+
+
+def test_discovery_results_are_cached_as_copies(fake_backend, use_backend):
+    use_backend(fake_backend())
+    tts_proxy.get_default_params()
+    specs = tts_proxy.list_param_specs("Kokoro TTS")
+    assert specs
+    specs.clear()
+    assert tts_proxy.list_param_specs("Kokoro TTS")
+    assert (tts_proxy.GRADIO_URL, "param_specs", "Kokoro TTS") in tts_proxy.DISCOVERY_CACHE.entries
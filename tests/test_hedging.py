@@ -0,0 +1,93 @@
+import itertools
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import tts_proxy
+
+PRIMARY = "http://primary.test/"
+REPLICA = "http://replica.test/"
+
+
+@pytest.fixture
+def hedges(monkeypatch):
+    """Two backends with hedging at the 90th percentile, and a fake ``call_gradio_tts``.
+
+    Tests set ``latency(url, call)``, where ``call`` numbers the primary's calls; the
+    fake sleeps that long in short steps and gives up once its attempt is cancelled.
+    """
+    stats = tts_proxy.HedgeStats()
+    monkeypatch.setattr(tts_proxy, "HEDGES", stats)
+    monkeypatch.setattr(tts_proxy, "HEDGE_PERCENTILE", 90.0)
+    monkeypatch.setattr(tts_proxy, "HEDGE_MIN_DELAY", 0.0)
+    monkeypatch.setattr(tts_proxy, "HEDGE_BUDGET", 1.0)
+    monkeypatch.setattr(tts_proxy, "ADMISSION_CHECK_INTERVAL", 0.01)
+    monkeypatch.setattr(tts_proxy, "ranked_backends", lambda engine: [PRIMARY, REPLICA])
+    monkeypatch.setattr(tts_proxy, "idle_backend", lambda engine, exclude: REPLICA)
+    calls = itertools.count()
+    env = SimpleNamespace(stats=stats, latency=lambda url, call: 0.01)
+
+    def fake_call(tts_engine, params, cancelled=None, url=None, report=None):
+        deadline = time.monotonic() + env.latency(url, next(calls) if url == PRIMARY else None)
+        while time.monotonic() < deadline:
+            if cancelled is not None and cancelled():
+                raise tts_proxy.RequestCancelled()
+            time.sleep(0.002)
+        return url
+
+    monkeypatch.setattr(tts_proxy, "call_gradio_tts", fake_call)
+    return env
+
+
+def dispatch() -> str:
+    source, url = tts_proxy.dispatch_tts("Kokoro TTS", {"text_input": "hi"})
+    assert source == url
+    return url
+
+
+def test_no_hedging_until_enough_samples(hedges):
+    for _ in range(tts_proxy.HEDGE_MIN_SAMPLES - 1):
+        assert dispatch() == PRIMARY
+    assert hedges.stats.delay("Kokoro TTS") is None
+    assert hedges.stats.counts["hedged"] == 0
+
+
+def test_hedge_wins_over_a_stalled_primary(hedges):
+    hedges.latency = lambda url, call: 0.01 if url == REPLICA or call < 30 else 5.0
+    for _ in range(30):
+        dispatch()
+    before = dict(hedges.stats.counts)
+    started = time.monotonic()
+    assert dispatch() == REPLICA
+    assert time.monotonic() - started < 1.0
+    assert hedges.stats.counts["hedged"] == before["hedged"] + 1
+    assert hedges.stats.counts["hedge_wins"] == before["hedge_wins"] + 1
+
+
+def test_budget_caps_hedges(hedges, monkeypatch):
+    monkeypatch.setattr(tts_proxy, "HEDGE_BUDGET", 0.05)
+    hedges.latency = lambda url, call: 0.01 if url == REPLICA or call < 20 else 0.1
+    for _ in range(40):
+        dispatch()
+    assert hedges.stats.counts["hedged"] <= 0.05 * tts_proxy.HEDGE_WINDOW
+    assert hedges.stats.counts["over_budget"] > 0
+
+
+def test_threshold_stays_stable_under_bimodal_latency(hedges):
+    # One primary call in four is slow, spread over 50-150 ms, so the 90th
+    # percentile sits inside the slow mode. The slowest primaries lose to a hedge;
+    # they must still count, or each round of hedging drops the top of the slow
+    # mode and the threshold keeps sinking.
+    slow = [0.05, 0.075, 0.1, 0.125, 0.15]
+    hedges.latency = lambda url, call: 0.005 if url == REPLICA or call % 4 else slow[call // 4 % len(slow)]
+    for _ in range(tts_proxy.HEDGE_MIN_SAMPLES):
+        dispatch()
+    first = hedges.stats.delay("Kokoro TTS")
+    for _ in range(200):
+        dispatch()
+    # Without the slow primaries the threshold falls to the fast mode (~5 ms) and
+    # most of the 50 slow calls get hedged.
+    assert first >= slow[0]
+    assert hedges.stats.delay("Kokoro TTS") >= slow[0]
+    assert hedges.stats.counts["hedged"] <= 30
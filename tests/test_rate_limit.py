@@ -0,0 +1,106 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import tts_proxy
+
+
+@pytest.fixture(autouse=True)
+def buckets(monkeypatch):
+    monkeypatch.setattr(tts_proxy, "API_KEY_BUCKETS", {})
+    monkeypatch.setattr(tts_proxy, "API_KEY_REQUESTS_PER_MINUTE", 0.0)
+    monkeypatch.setattr(tts_proxy, "API_KEY_CHARS_PER_MINUTE", 0.0)
+    return tts_proxy.API_KEY_BUCKETS
+
+
+def entry(**limits) -> dict:
+    return {"key": "key-1", "name": "test", **limits}
+
+
+def test_bucket_bursts_one_minute_and_refills():
+    bucket = tts_proxy.TokenBucket(6)
+    assert bucket.capacity == 6
+    bucket.take(6)
+    assert bucket.wait_time(1) == pytest.approx(10.0)
+    bucket.refill(bucket.updated + 30)
+    assert bucket.tokens == pytest.approx(3)
+    bucket.refill(bucket.updated + 600)
+    assert bucket.tokens == 6
+
+
+def test_fractional_rate_still_admits_a_request():
+    bucket = tts_proxy.TokenBucket(0.5)
+    assert bucket.capacity == 1.0
+    assert bucket.wait_time(1) == 0.0
+    bucket.take(1)
+    assert bucket.wait_time(1) == pytest.approx(120.0)
+
+
+def test_request_limit_answers_429_with_retry_after():
+    limited = entry(requests_per_minute=2)
+    tts_proxy.consume_rate_limit(limited, 10)
+    tts_proxy.consume_rate_limit(limited, 10)
+    with pytest.raises(HTTPException) as exc:
+        tts_proxy.consume_rate_limit(limited, 10)
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) == 30
+
+
+def test_rejected_request_takes_no_tokens():
+    limited = entry(requests_per_minute=10, chars_per_minute=100)
+    tts_proxy.consume_rate_limit(limited, 80)
+    with pytest.raises(HTTPException):
+        tts_proxy.consume_rate_limit(limited, 80)
+    assert tts_proxy.API_KEY_BUCKETS["key-1"]["requests"].tokens == pytest.approx(9, abs=0.01)
+
+
+def test_input_over_the_char_limit_is_413():
+    with pytest.raises(HTTPException) as exc:
+        tts_proxy.consume_rate_limit(entry(chars_per_minute=100), 101)
+    assert exc.value.status_code == 413
+    tts_proxy.consume_rate_limit(entry(chars_per_minute=100), 100)
+
+
+def test_changed_limits_replace_the_buckets(buckets):
+    tts_proxy.consume_rate_limit(entry(requests_per_minute=1), 1)
+    with pytest.raises(HTTPException):
+        tts_proxy.consume_rate_limit(entry(requests_per_minute=1), 1)
+    tts_proxy.consume_rate_limit(entry(requests_per_minute=5), 1)
+    assert buckets["key-1"]["limits"]["requests"] == 5
+
+
+def test_unlimited_keys_get_no_buckets(buckets):
+    for _ in range(100):
+        tts_proxy.consume_rate_limit(entry(), 10_000)
+    assert set(buckets["key-1"]) == {"limits"}
+
+
+def test_limits_over_the_api(fake_backend, use_backend, monkeypatch, buckets, tmp_path):
+    use_backend(fake_backend())
+    # Keys live in their own folder so later tests still run without one.
+    monkeypatch.setattr(tts_proxy, "API_KEY_FILE", tmp_path / "api_key.txt")
+    monkeypatch.setattr(tts_proxy, "API_KEYS_FILE", tmp_path / "api_keys.json")
+    monkeypatch.setattr(tts_proxy, "API_KEY_REGISTRY", {"entries": [], "by_digest": {}, "signature": None, "checked": None})
+    monkeypatch.setattr(tts_proxy, "ADMIN_USERNAME", "admin")
+    monkeypatch.setattr(tts_proxy, "ADMIN_PASSWORD", "secret")
+    admin = ("admin", "secret")
+    with TestClient(tts_proxy.app) as client:
+        key = client.post(
+            "/v1/tts/api-key/generate", auth=admin, json={"name": "limited", "chars_per_minute": 50}
+        ).json()["api_key"]
+        headers = {"Authorization": f"Bearer {key}"}
+
+        def speak(text: str) -> int:
+            return client.post(
+                "/v1/audio/speech",
+                headers=headers,
+                json={"input": text, "model": "Kokoro TTS", "voice": "af_heart", "response_format": "wav"},
+            ).status_code
+
+        assert speak("x" * 51) == 413
+        assert speak("x" * 40) == 200
+        assert speak("y" * 40) == 429
+        assert key in buckets
+        # Rotating the key drops the old key's buckets.
+        client.post("/v1/tts/api-key/generate", auth=admin, json={"name": "limited"})
+        assert key not in buckets